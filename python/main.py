@@ -1,8 +1,15 @@
 import argparse
+import os
+import sys
 import unittest
 from pathlib import Path
-from src.json_parser import JsonParser
-from src.pprint_objects import pprint_dict
+from src.bench import CORPORA, print_report, run_benchmarks, write_report
+from src.errors import JsonParseError
+from src.json_parser import BytesJsonParser, JsonParser
+from src.ndjson import parse_ndjson
+from src.parallel import parse_parallel
+from src.pprint_objects import pprint_json
+from src.profiling import ParseProfile
 
 TEST_PATH = Path(__file__).parent / Path("tests")
 
@@ -22,6 +29,91 @@ if __name__ == "__main__":
 
     parser.add_argument("-t", "--tests", action="store_true", help="Run all tests.")
 
+    parser.add_argument(
+        "--bench",
+        action="store_true",
+        help="Run the parser benchmarks against the stdlib json module.",
+    )
+    parser.add_argument(
+        "--bench-output",
+        type=str,
+        default="bench_results.json",
+        help="Path the benchmark results are written to as JSON.",
+    )
+    parser.add_argument(
+        "--bench-scale",
+        type=float,
+        default=1.0,
+        help="Multiplier applied to the size of the generated benchmark corpora.",
+    )
+    parser.add_argument(
+        "--bench-repeat",
+        type=int,
+        default=3,
+        help="Number of timed runs per corpus; the fastest run is reported.",
+    )
+    parser.add_argument(
+        "--bench-corpus",
+        action="append",
+        choices=list(CORPORA),
+        help="Only run the given corpus (may be passed more than once).",
+    )
+
+    parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="Parse input files through a memory map instead of reading them.",
+    )
+    parser.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="Parse the input file(s) as JSON Lines, one object per line.",
+    )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Parse each large input file across a pool of worker processes.",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes for --ndjson and --parallel "
+        "(default: one per CPU).",
+    )
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="With --ndjson, print each shard as soon as it is parsed.",
+    )
+
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="Only check that each input is valid JSON, without building it.",
+    )
+
+    parser.add_argument(
+        "-c",
+        "--compact",
+        action="store_true",
+        help="Print parsed objects on a single line instead of indented.",
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print where the time goes while parsing each input instead of "
+        "the parsed object.",
+    )
+    parser.add_argument(
+        "--profile-format",
+        choices=["table", "json", "prometheus"],
+        default="table",
+        help="Format of the --profile output (default: table).",
+    )
+
     # Parse the command-line arguments
     args = parser.parse_args()
 
@@ -31,6 +123,21 @@ if __name__ == "__main__":
         runner = unittest.TextTestRunner()
         runner.run(suite)
 
+    if args.bench:
+        report = run_benchmarks(
+            scale=args.bench_scale,
+            repeat=args.bench_repeat,
+            corpora=args.bench_corpus,
+        )
+        print_report(report)
+        write_report(report, args.bench_output)
+        print(f"Benchmark results written to {args.bench_output}")
+        # nothing else to do unless files to parse were passed as well
+        if len(args.input_files) == 0:
+            sys.exit(0)
+
+    indent = None if args.compact else 4
+
     if len(args.input_files) == 0:
         user_input = []
         print("No input file detected.")
@@ -39,13 +146,77 @@ if __name__ == "__main__":
     else:
         user_input: list = args.input_files
 
-    jp = JsonParser()
+    if args.ndjson:
+        for path in user_input:
+            for shard_result in parse_ndjson(
+                path, workers=args.workers, ordered=not args.unordered
+            ):
+                for record in shard_result.records:
+                    if record.error is None:
+                        pprint_json(record.value, indent=indent)
+                        print(0)
+                    else:
+                        print(f"{path}:{record.line}: {record.error}")
+                        print(1)
+        sys.exit(0)
+
+    if args.validate:
+        for ui in user_input:
+            name = "<input>"
+            try:
+                # files are checked as raw bytes, so they are never decoded
+                if len(args.input_files) > 0:
+                    name = ui
+                    error = BytesJsonParser().validate(Path(ui).read_bytes())
+                else:
+                    error = JsonParser().validate(ui)
+            except OSError as e:
+                print(e)
+                print(1)
+                continue
+            if error is None:
+                print(0)
+            else:
+                print(f"{name}:{error.line}:{error.column}: {error}")
+                print(error.snippet)
+                print(1)
+        sys.exit(0)
+
+    # typed-in JSON has no file to map
+    use_mmap = args.mmap and len(args.input_files) > 0
+    profile = ParseProfile() if args.profile else None
+    jp = BytesJsonParser(profile=profile) if use_mmap else JsonParser(profile=profile)
 
     for ui in user_input:
         try:
-            res = jp.parse_json(ui)
-            pprint_dict(res)
+            # an argument that is not a file is parsed as JSON text
+            is_file = len(args.input_files) > 0 and os.path.exists(ui)
+            # a profile only sees the parser in this process
+            if args.parallel and is_file and profile is None:
+                res = parse_parallel(ui, workers=args.workers)
+            elif use_mmap and is_file:
+                res = jp.parse_mmap(ui)
+            elif use_mmap:
+                res = jp.parse_bytes(ui.encode("utf-8"))
+            elif is_file:
+                res = jp.parse_file(ui)
+            else:
+                res = jp.parse_text(ui)
+            if profile is None:
+                pprint_json(res, indent=indent)
+            elif args.profile_format == "json":
+                pprint_json(profile.as_dict(), indent=indent)
+            elif args.profile_format == "prometheus":
+                print(profile.to_prometheus(), end="")
+            else:
+                print(profile.format_report())
             print(0)
         except Exception as e:
             print(e)
+            # show where in the input a parse error was found, when known
+            if isinstance(e, JsonParseError) and e.snippet is not None:
+                print(f"line {e.line}, column {e.column}:")
+                print(e.snippet)
             print(1)
+        if profile is not None:
+            profile.reset()
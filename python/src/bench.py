@@ -0,0 +1,172 @@
+import json
+import platform
+import random
+import string
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+from src.json_parser import JsonParser
+from src.pprint_objects import dumps
+
+FIXTURES_PATH = Path(__file__).parent.parent / Path("tests") / Path("test_files")
+
+# characters used for generated keys and string values; quotes and
+# backslashes are left out since string escapes are not supported
+TEXT_CHARS = string.ascii_letters + string.digits + " -_/.:;!?[]{}"
+
+
+def _random_text(rng: random.Random, length: int) -> str:
+    return "".join(rng.choices(TEXT_CHARS, k=length))
+
+
+def wide_object(scale: float = 1.0, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    members = []
+    for i in range(int(20000 * scale)):
+        val = rng.choice(
+            [
+                f'"{_random_text(rng, 12)}"',
+                str(rng.randint(-10000, 10000)),
+                "true",
+                "false",
+                "null",
+            ]
+        )
+        members.append(f'"key-{i}": {val}')
+    return "{" + ", ".join(members) + "}"
+
+
+def deep_nesting(scale: float = 1.0, seed: int = 0) -> str:
+    # the stdlib parser recurses and runs out of stack well before 1000
+    # levels, so repeat a moderately nested document instead of going deeper
+    depth = 100
+    doc = "{" + '"k": {' * depth + '"leaf": [1, 2, 3]' + "}" * depth + "}"
+    copies = max(1, int(200 * scale))
+    return "{" + ", ".join(f'"doc-{i}": {doc}' for i in range(copies)) + "}"
+
+
+def long_strings(scale: float = 1.0, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    members = [
+        f'"key-{i}": "{_random_text(rng, 20000)}"' for i in range(int(50 * scale))
+    ]
+    return "{" + ", ".join(members) + "}"
+
+
+def number_array(scale: float = 1.0, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    values = []
+    for _ in range(int(100000 * scale)):
+        kind = rng.randrange(3)
+        if kind == 0:
+            values.append(str(rng.randint(-(10**9), 10**9)))
+        elif kind == 1:
+            values.append(f"{rng.uniform(-1000, 1000):.6f}")
+        else:
+            values.append(f"{rng.randint(1, 999)}e{rng.randint(0, 20)}")
+    return '{"values": [' + ", ".join(values) + "]}"
+
+
+def scaled_fixtures(scale: float = 1.0, seed: int = 0) -> str:
+    fixtures = [
+        p.read_text().strip() for p in sorted(FIXTURES_PATH.glob("step*/valid*.json"))
+    ]
+    copies = int(3000 * scale)
+    members = [f'"doc-{i}": {fixtures[i % len(fixtures)]}' for i in range(copies)]
+    return "{" + ", ".join(members) + "}"
+
+
+CORPORA: dict[str, Callable[[float, int], str]] = {
+    "wide_object": wide_object,
+    "deep_nesting": deep_nesting,
+    "long_strings": long_strings,
+    "number_array": number_array,
+    "scaled_fixtures": scaled_fixtures,
+}
+
+PARSERS: dict[str, Callable[[str], object]] = {
+    "json_parser": lambda doc: JsonParser().parse_json(doc),
+    "stdlib_json": json.loads,
+    # parse and write back out as compact JSON
+    "jp_roundtrip": lambda doc: dumps(JsonParser().parse_json(doc)),
+    "stdlib_roundtrip": lambda doc: json.dumps(json.loads(doc), separators=(",", ":")),
+    # well-formedness check only
+    "jp_validate": lambda doc: JsonParser().validate(doc),
+}
+
+
+def measure(parse: Callable[[str], object], doc: str, repeat: int) -> dict:
+    size = len(doc.encode("utf-8"))
+
+    # timing runs are done without tracemalloc, which slows allocation down
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(doc)
+        times.append(time.perf_counter() - start)
+    best = min(times)
+
+    # a separate traced run for peak memory and the number of memory
+    # blocks the result (and anything else the parse kept) still holds.
+    # blocks allocated and freed during the parse are not counted
+    tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    res = parse(doc)
+    retained_blocks = sys.getallocatedblocks() - blocks_before
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del res
+
+    return {
+        "bytes": size,
+        "seconds": best,
+        "mb_per_s": size / 1e6 / best,
+        "docs_per_s": 1 / best,
+        "peak_memory_bytes": peak,
+        "retained_blocks": retained_blocks,
+    }
+
+
+def run_benchmarks(
+    scale: float = 1.0, repeat: int = 3, seed: int = 0, corpora: list | None = None
+) -> dict:
+    results = []
+    for name in corpora or CORPORA:
+        doc = CORPORA[name](scale, seed)
+        for parser_name, parse in PARSERS.items():
+            res = measure(parse, doc, repeat)
+            res["corpus"] = name
+            res["parser"] = parser_name
+            results.append(res)
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "scale": scale,
+        "repeat": repeat,
+        "seed": seed,
+        "results": results,
+    }
+
+
+def print_report(report: dict) -> None:
+    header = (
+        f'{"corpus":<16}{"parser":<18}{"MB/s":>10}{"docs/s":>10}'
+        f'{"peak MB":>10}{"retained blocks":>16}'
+    )
+    print(header)
+    print("-" * len(header))
+    for r in report["results"]:
+        print(
+            f'{r["corpus"]:<16}{r["parser"]:<18}{r["mb_per_s"]:>10.2f}'
+            f'{r["docs_per_s"]:>10.2f}{r["peak_memory_bytes"] / 1e6:>10.2f}'
+            f'{r["retained_blocks"]:>16}'
+        )
+
+
+def write_report(report: dict, path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(report, f, indent=4)
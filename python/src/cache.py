@@ -0,0 +1,182 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any
+
+DEFAULT_KEY_CACHE_SIZE = 4096
+DEFAULT_PARSE_CACHE_SIZE = 128
+
+# returned by 'ParseCache.get' when there is no usable entry
+MISSING = object()
+
+
+class KeyCache(object):
+    """Bounded LRU cache used to intern object keys.
+
+    Every key parsed while the cache is attached to a parser is swapped for
+    the first instance of an equal string seen before, so arrays of records
+    that repeat the same keys share a single str per key. The cache lives on
+    the parser (or can be shared between parsers), so it persists across
+    parse calls.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_KEY_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self.keys: OrderedDict[str, str] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def intern(self, key: str) -> str:
+        cached = self.keys.get(key)
+
+        if cached is not None:
+            self.hits += 1
+            self.keys.move_to_end(key)
+            return cached
+
+        self.misses += 1
+        self.keys[key] = key
+        if len(self.keys) > self.maxsize:
+            self.keys.popitem(last=False)
+            self.evictions += 1
+
+        return key
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.keys),
+            "maxsize": self.maxsize,
+        }
+
+    def clear(self) -> None:
+        self.keys.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+# values a parser returns that are immutable, and so shared by copies
+SCALAR_TYPES = (str, int, float, bool)
+
+
+def copy_value(value: Any) -> Any:
+    # copy the dicts and lists of a parsed value, without recursing so that
+    # any depth the parser accepted can be copied. returns MISSING for a
+    # value holding anything else, such as the proxies returned by lazy,
+    # columnar and compact parsers, which can't be copied
+    if type(value) is dict:
+        res: Any = {}
+    elif type(value) is list:
+        res = []
+    elif type(value) in SCALAR_TYPES:
+        return value
+    else:
+        return MISSING
+
+    stack = [(value, res)]
+    while stack:
+        src, dst = stack.pop()
+        items = src.items() if type(src) is dict else enumerate(src)
+        for key, val in items:
+            if type(val) is dict or type(val) is list:
+                copy = {} if type(val) is dict else []
+                stack.append((val, copy))
+                val = copy
+            elif type(val) not in SCALAR_TYPES:
+                return MISSING
+            if type(dst) is dict:
+                dst[key] = val
+            else:
+                dst.append(val)
+
+    return res
+
+
+class ParseCache(object):
+    """Bounded LRU cache of parse results, with an optional time to live.
+
+    Documents given as text are keyed by a hash of their contents, and files
+    by their path, modification time and size, so a file is parsed again
+    once it changes, and by the options of the parser, so parsers that
+    build different values share a cache safely. Entries hold their own
+    copy of the result and every hit returns a new copy, so callers can
+    modify what they get back without corrupting the cache. Results that
+    can't be copied (those holding lazy, columnar or compact proxies) are
+    not stored.
+    """
+
+    def __init__(
+        self, maxsize: int = DEFAULT_PARSE_CACHE_SIZE, ttl: float | None = None
+    ) -> None:
+        self.maxsize = maxsize
+        # seconds an entry stays usable after it is stored, or None to keep
+        # entries until they are evicted
+        self.ttl = ttl
+        self.entries: OrderedDict[tuple, tuple[Any, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def make_key(self, s: str | bytes, options: tuple = ()) -> tuple:
+        # 's' is what was passed to 'parse_json': a file path or JSON text.
+        # 'options' are those of the parser that change what it returns
+        if os.path.exists(s):
+            st = os.stat(s)
+            return ("file", os.path.abspath(s), st.st_mtime_ns, st.st_size, options)
+
+        data = s if isinstance(s, bytes) else s.encode("utf-8", "surrogatepass")
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        return ("text", type(s), digest, options)
+
+    def get(self, key: tuple) -> Any:
+        entry = self.entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return MISSING
+
+        value, expires = entry
+        if self.ttl is not None and time.monotonic() >= expires:
+            del self.entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return MISSING
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return copy_value(value)
+
+    def put(self, key: tuple, value: Any) -> None:
+        value = copy_value(value)
+        if value is MISSING:
+            return
+
+        expires = 0.0 if self.ttl is None else time.monotonic() + self.ttl
+        self.entries[key] = (value, expires)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+        }
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
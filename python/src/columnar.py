@@ -0,0 +1,239 @@
+from array import array
+from collections.abc import Sequence
+from typing import Any
+
+# the value JsonParser gives a JSON null
+NULL = "null"
+
+# record arrays are looked for down to this many levels of nested objects;
+# anything deeper is built the usual way
+COLUMNAR_MAX_DEPTH = 64
+
+# array typecodes for the kinds of column that are stored unboxed
+TYPECODES = {"int": "q", "float": "d", "bool": "b"}
+PLACEHOLDERS = {"int": 0, "float": 0.0, "bool": False, "str": ""}
+KINDS = {bool: "bool", int: "int", float: "float", str: "str"}
+
+
+class Column(object):
+    """One field of a record array.
+
+    Numbers and booleans are stored in an 'array.array' and strings in a
+    list. A column holding both ints and floats is stored as floats, so its
+    ints come back as floats. Nulls are kept in a bitmap ('nulls', bit i
+    set when row i is null), with a placeholder stored at their position in
+    'values'.
+    """
+
+    def __init__(self) -> None:
+        # the kind is only known once the first non-null value is seen
+        self.kind: str | None = None
+        self.values: Any = []
+        self.nulls = bytearray()
+        self.length = 0
+
+    def append(self, val: Any, is_null: bool) -> bool:
+        # returns False if the value doesn't fit in the column
+        if is_null:
+            self.values.append(PLACEHOLDERS.get(self.kind))
+        else:
+            kind = KINDS[type(val)]
+            if self.kind is None or (self.kind == "int" and kind == "float"):
+                self.set_kind(kind)
+            elif kind != self.kind and not (self.kind == "float" and kind == "int"):
+                return False
+            try:
+                self.values.append(val)
+            except OverflowError:
+                # an int that doesn't fit in 64 bits
+                return False
+
+        i = self.length
+        if i % 8 == 0:
+            self.nulls.append(0)
+        if is_null:
+            self.nulls[i >> 3] |= 1 << (i & 7)
+        self.length += 1
+
+        return True
+
+    def set_kind(self, kind: str) -> None:
+        if self.kind is None:
+            # every value so far was null
+            values = [PLACEHOLDERS[kind]] * self.length
+        else:
+            # an int column that has met its first float
+            values = self.values
+
+        self.kind = kind
+        self.values = array(TYPECODES[kind], values) if kind in TYPECODES else values
+
+    def is_null(self, i: int) -> bool:
+        return bool(self.nulls[i >> 3] & (1 << (i & 7)))
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, i: int) -> Any:
+        if self.is_null(i):
+            return NULL
+        val = self.values[i]
+        return bool(val) if self.kind == "bool" else val
+
+    def to_list(self) -> list:
+        return [self[i] for i in range(self.length)]
+
+
+class ColumnarTable(Sequence):
+    """An array of objects that all have the same keys, stored by column.
+
+    Indexing gives back a row as a dict, so the table can stand in for the
+    list that 'parse_list' would have returned; 'columns' maps each key to
+    its 'Column' for working on whole columns at once.
+    """
+
+    def __init__(self, columns: dict[str, Column], length: int) -> None:
+        self.columns = columns
+        self.length = length
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, i: int | slice) -> dict | list[dict]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.length))]
+        if i < 0:
+            i += self.length
+        if not 0 <= i < self.length:
+            raise IndexError("ColumnarTable index out of range")
+        return {key: column[i] for key, column in self.columns.items()}
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        kinds = ", ".join(f"{k}: {c.kind}" for k, c in self.columns.items())
+        return f"ColumnarTable({self.length} rows; {kinds})"
+
+    def to_records(self) -> list[dict]:
+        return [self[i] for i in range(self.length)]
+
+
+def parse_record_array(jp) -> ColumnarTable | None:
+    # read the array at the cursor into columns. if it turns out not to be a
+    # non-empty array of flat objects that all have the same keys, the cursor
+    # is put back at the start of the array and None is returned
+    start = jp.ptr
+    buf = jp.buf
+    columns: dict[str, Column] = {}
+    rows = 0
+
+    jp.ptr += 1
+    jp.skip_whitespace()
+
+    while buf[jp.ptr] != jp.CLOSE_ARRAY:
+        if buf[jp.ptr] != jp.OPEN_OBJECT:
+            jp.ptr = start
+            return
+
+        jp.ptr += 1
+        jp.skip_whitespace()
+        n_keys = 0
+
+        while buf[jp.ptr] != jp.CLOSE_OBJECT:
+            key = jp.parse_key()
+            jp.skip_whitespace()
+            jp.parse_colon()
+
+            char = buf[jp.ptr]
+            if char == jp.OPEN_OBJECT or char == jp.OPEN_ARRAY:
+                jp.ptr = start
+                return
+
+            # read the scalar here rather than through 'parse_value', so
+            # that a null can be told apart from the string "null"
+            is_null = False
+            if char == jp.QUOTE:
+                val = jp.parse_string()
+            else:
+                val = jp.parse_number()
+                if val is None:
+                    val = jp.parse_reserved_word()
+                    if val is None:
+                        raise jp.error("Value unable to be parsed: invalid entry.")
+                    is_null = val == NULL
+
+            column = columns.get(key)
+            if column is None:
+                if rows > 0:
+                    # a key the first record doesn't have
+                    jp.ptr = start
+                    return
+                column = columns[key] = Column()
+
+            # a key repeated within one record, or a value of another type
+            if len(column) != rows or not column.append(val, is_null):
+                jp.ptr = start
+                return
+
+            n_keys += 1
+            jp.skip_whitespace()
+            jp.parse_comma()
+
+        # step past the record's closing bracket
+        jp.ptr += 1
+
+        # a record missing some of the keys
+        if n_keys == 0 or n_keys != len(columns):
+            jp.ptr = start
+            return
+
+        rows += 1
+        jp.skip_whitespace()
+        jp.parse_comma()
+
+    if rows == 0:
+        jp.ptr = start
+        return
+
+    # step past the array's closing bracket
+    jp.ptr += 1
+
+    return ColumnarTable(columns, rows)
+
+
+def parse_columnar_value(jp, depth: int = 0) -> Any:
+    # build the value at the cursor like 'JsonParser.build', except that
+    # record arrays reached through objects come back as ColumnarTables
+    buf = jp.buf
+    char = buf[jp.ptr]
+
+    if char == jp.OPEN_ARRAY:
+        # the records of a table are one level below the array
+        if depth + 1 < jp.max_depth:
+            table = parse_record_array(jp)
+            if table is not None:
+                return table
+        return jp.build(depth)
+
+    if char != jp.OPEN_OBJECT or depth >= min(jp.max_depth, COLUMNAR_MAX_DEPTH):
+        return jp.build(depth)
+
+    res = {}
+    jp.ptr += 1
+    jp.skip_whitespace()
+
+    while buf[jp.ptr] != jp.CLOSE_OBJECT:
+        key = jp.parse_key()
+        jp.skip_whitespace()
+        jp.parse_colon()
+        res[key] = parse_columnar_value(jp, depth + 1)
+        jp.skip_whitespace()
+        jp.parse_comma()
+
+    # step past final closing bracket
+    jp.ptr += 1
+
+    return res
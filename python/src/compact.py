@@ -0,0 +1,263 @@
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+from typing import Any, Iterable, Iterator
+
+# node kinds
+OBJECT = 0
+ARRAY = 1
+STRING = 2
+INT = 3
+FLOAT = 4
+TRUE = 5
+FALSE = 6
+BIG_INT = 7  # an int too large for the 64-bit payload table
+
+CONTAINER_KINDS = {"start_object": OBJECT, "start_array": ARRAY}
+
+# objects with fewer members than this are searched for a key by scanning
+# them; wider ones get a sorted table of their key ids on first lookup
+MIN_INDEXED_WIDTH = 64
+
+
+class CompactTree(object):
+    """A parsed document stored as flat tables instead of dicts and lists.
+
+    Every value is a node. 'kinds' holds each node's kind and 'payload' its
+    data: the int itself, an index into 'floats' or 'values' (strings and
+    big ints), or for containers an index into 'child_start'/'child_count'.
+    Those give the slice of 'children' (node ids) and 'child_keys' (ids of
+    key strings in 'values', -1 for arrays) that belong to the container.
+    Keys are stored once per distinct key.
+    """
+
+    def __init__(self) -> None:
+        self.kinds = array("b")
+        self.payload = array("q")
+        self.floats = array("d")
+        self.values: list = []
+        self.child_start = array("q")
+        self.child_count = array("q")
+        self.children = array("q")
+        self.child_keys = array("q")
+        # also used for key lookups on objects once the tree is built
+        self.key_ids: dict[str, int] = {}
+        # (sorted key ids, their positions in 'children') for each wide
+        # object that has been looked up in, by node id
+        self.slots: dict[int, tuple[array, array]] = {}
+
+    def add_node(self, kind: int, payload: int) -> int:
+        self.kinds.append(kind)
+        self.payload.append(payload)
+        return len(self.kinds) - 1
+
+    def add_value(self, val: Any) -> int:
+        if val is True:
+            return self.add_node(TRUE, 0)
+        if val is False:
+            return self.add_node(FALSE, 0)
+        if type(val) is float:
+            self.floats.append(val)
+            return self.add_node(FLOAT, len(self.floats) - 1)
+        if type(val) is int and -(2**63) <= val < 2**63:
+            return self.add_node(INT, val)
+
+        self.values.append(val)
+        kind = STRING if type(val) is str else BIG_INT
+        return self.add_node(kind, len(self.values) - 1)
+
+    def add_container(self, kind: int) -> int:
+        self.child_start.append(0)
+        self.child_count.append(0)
+        return self.add_node(kind, len(self.child_start) - 1)
+
+    def key_id(self, key: str) -> int:
+        kid = self.key_ids.get(key)
+        if kid is None:
+            self.values.append(key)
+            kid = self.key_ids[key] = len(self.values) - 1
+        return kid
+
+    def close_container(self, node: int, ids: array, keys: array) -> None:
+        if self.kinds[node] == OBJECT and len(set(keys)) < len(keys):
+            # repeated keys keep the last value, like a dict would
+            members = dict(zip(keys, ids))
+            keys = array("q", members.keys())
+            ids = array("q", members.values())
+
+        container = self.payload[node]
+        self.child_start[container] = len(self.children)
+        self.child_count[container] = len(ids)
+        self.children.extend(ids)
+        self.child_keys.extend(keys)
+
+    def get(self, node: int) -> Any:
+        kind = self.kinds[node]
+        payload = self.payload[node]
+
+        if kind == INT:
+            return payload
+        if kind == STRING or kind == BIG_INT:
+            return self.values[payload]
+        if kind == FLOAT:
+            return self.floats[payload]
+        if kind == OBJECT:
+            return CompactObject(self, node)
+        if kind == ARRAY:
+            return CompactArray(self, node)
+        return kind == TRUE
+
+    def find_member(self, node: int, kid: int) -> int:
+        # the position in 'children' of the member of object 'node' with key
+        # id 'kid', or -1. narrow objects are scanned; wide ones are searched
+        # in a table of two arrays, kept so that lookups stay cheap in memory
+        start, end = self.child_range(node)
+        if end - start < MIN_INDEXED_WIDTH:
+            try:
+                return self.child_keys.index(kid, start, end)
+            except ValueError:
+                return -1
+
+        table = self.slots.get(node)
+        if table is None:
+            order = sorted(range(start, end), key=self.child_keys.__getitem__)
+            keys = array("q", [self.child_keys[i] for i in order])
+            table = self.slots[node] = (keys, array("q", order))
+
+        keys, slots = table
+        i = bisect_left(keys, kid)
+        if i < len(keys) and keys[i] == kid:
+            return slots[i]
+        return -1
+
+    def child_range(self, node: int) -> tuple[int, int]:
+        container = self.payload[node]
+        start = self.child_start[container]
+        return start, start + self.child_count[container]
+
+    def to_python(self, node: int) -> Any:
+        # rebuild plain dicts and lists, without recursing so that any depth
+        # the parser accepted can be converted
+        root = self.get(node)
+        if not isinstance(root, CompactNode):
+            return root
+
+        res = {} if self.kinds[node] == OBJECT else []
+        stack = [(node, res)]
+
+        while stack:
+            node, container = stack.pop()
+            start, end = self.child_range(node)
+            for i in range(start, end):
+                child = self.children[i]
+                val = self.get(child)
+                if isinstance(val, CompactNode):
+                    val = {} if self.kinds[child] == OBJECT else []
+                    stack.append((child, val))
+                if type(container) is dict:
+                    container[self.values[self.child_keys[i]]] = val
+                else:
+                    container.append(val)
+
+        return res
+
+
+class CompactNode(object):
+    """Read-only view of one container node of a CompactTree."""
+
+    __slots__ = ("tree", "node")
+
+    def __init__(self, tree: CompactTree, node: int) -> None:
+        self.tree = tree
+        self.node = node
+
+    def __len__(self) -> int:
+        return self.tree.child_count[self.tree.payload[self.node]]
+
+    def to_python(self) -> Any:
+        return self.tree.to_python(self.node)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_python()!r})"
+
+
+class CompactObject(CompactNode, Mapping):
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        tree = self.tree
+        kid = tree.key_ids.get(key) if isinstance(key, str) else None
+        if kid is None:
+            raise KeyError(key)
+
+        i = tree.find_member(self.node, kid)
+        if i < 0:
+            raise KeyError(key)
+
+        return tree.get(tree.children[i])
+
+    def __iter__(self) -> Iterator[str]:
+        tree = self.tree
+        start, end = tree.child_range(self.node)
+        for i in range(start, end):
+            yield tree.values[tree.child_keys[i]]
+
+
+class CompactArray(CompactNode, Sequence):
+    __slots__ = ()
+
+    def __getitem__(self, i: int | slice) -> Any:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+
+        tree = self.tree
+        start, end = tree.child_range(self.node)
+        if i < 0:
+            i += end - start
+        if not 0 <= i < end - start:
+            raise IndexError("CompactArray index out of range")
+
+        return tree.get(tree.children[start + i])
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+
+def build_compact(events: Iterable[tuple[Any, Any]]) -> Any:
+    # the CompactTree counterpart of 'build_value': consume the events of one
+    # value and return its root node (or the value itself for a scalar)
+    tree = CompactTree()
+    # (node, child ids, key ids) for every open container
+    stack: list[tuple[int, array, array]] = []
+    key = -1
+
+    for event, val in events:
+        name = event.value
+
+        if name == "key":
+            key = tree.key_id(val)
+            continue
+        if name == "end_object" or name == "end_array":
+            node, ids, keys = stack.pop()
+            tree.close_container(node, ids, keys)
+            if not stack:
+                break
+            continue
+
+        if name in CONTAINER_KINDS:
+            node = tree.add_container(CONTAINER_KINDS[name])
+        else:
+            node = tree.add_value(val)
+
+        if stack:
+            stack[-1][1].append(node)
+            stack[-1][2].append(key)
+        elif name == "value":
+            break
+
+        if name in CONTAINER_KINDS:
+            stack.append((node, array("q"), array("q")))
+
+    return tree.get(0)
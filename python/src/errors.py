@@ -1,2 +1,100 @@
+from typing import Any
+
+# characters of context shown on each side of an error in its snippet
+SNIPPET_WIDTH = 40
+
+# inputs without a 'count' method (memory maps) are searched for newlines
+# in slices of this size
+NEWLINE_SCAN_SIZE = 16 * 1024 * 1024
+
+
+def count_newlines(source: Any, end: int) -> int:
+    newline = "\n" if isinstance(source, str) else b"\n"
+    if hasattr(source, "count"):
+        return source.count(newline, 0, end)
+
+    count = 0
+    for start in range(0, end, NEWLINE_SCAN_SIZE):
+        count += source[start : min(start + NEWLINE_SCAN_SIZE, end)].count(newline)
+    return count
+
+
+def locate(source: Any, offset: int) -> tuple[int, int, str]:
+    # the line and column (both from 1) of 'offset' in 'source', and the
+    # text around it with a caret under the offset
+    newline = "\n" if isinstance(source, str) else b"\n"
+    offset = min(offset, len(source))
+    line_start = source.rfind(newline, 0, offset) + 1
+    line_end = source.find(newline, offset)
+    if line_end == -1:
+        line_end = len(source)
+
+    start = max(line_start, offset - SNIPPET_WIDTH)
+    end = min(line_end, offset + SNIPPET_WIDTH)
+    before = source[start:offset]
+    after = source[offset:end]
+    if not isinstance(source, str):
+        before = before.decode("utf-8", "replace")
+        after = after.decode("utf-8", "replace")
+    text = (before + after).rstrip("\r")
+
+    line = count_newlines(source, offset) + 1
+    column = offset - line_start + 1
+    return line, column, text + "\n" + " " * len(before) + "^"
+
+
 class JsonParseError(Exception):
+    """Raised for invalid JSON.
+
+    'offset' is the position in the input the error was found at
+    (characters into text, bytes into bytes), when known. 'line', 'column'
+    and 'snippet' are only worked out from the input the first time one of
+    them is read, so raising the error costs nothing extra; until then the
+    error holds on to the input. str(error) is always just the message.
+    """
+
+    def __init__(
+        self, message: str, offset: int | None = None, source: Any = None
+    ) -> None:
+        super().__init__(message)
+        self.offset = offset
+        self.source = source
+        # (line, column, snippet), once worked out
+        self.position: tuple[int, int, str] | None = None
+
+    def locate(self) -> tuple[int, int, str] | None:
+        # work out the position now and let go of the input, e.g. before a
+        # memory map it points into is closed
+        if self.position is None and self.offset is not None:
+            if self.source is not None:
+                self.position = locate(self.source, self.offset)
+        self.source = None
+        return self.position
+
+    @property
+    def line(self) -> int | None:
+        position = self.locate()
+        return None if position is None else position[0]
+
+    @property
+    def column(self) -> int | None:
+        position = self.locate()
+        return None if position is None else position[1]
+
+    @property
+    def snippet(self) -> str | None:
+        position = self.locate()
+        return None if position is None else position[2]
+
+    def __reduce__(self) -> tuple:
+        # the input is not sent to another process, only the position
+        state = {"position": self.locate()}
+        return type(self), (self.args[0], self.offset), state
+
+
+class JsonPathError(Exception):
+    pass
+
+
+class JsonSchemaError(Exception):
     pass
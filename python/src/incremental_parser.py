@@ -0,0 +1,160 @@
+import codecs
+import re
+from typing import BinaryIO, Iterator, TextIO
+from src.errors import JsonParseError
+from src.json_parser import DEFAULT_MAX_DEPTH, WHITESPACE, JsonParser
+
+# the only characters that matter when looking for the end of a value;
+# strings have no escapes, so a quote always opens or closes one. arrays
+# are counted in the depth along with objects, so the depth limit applies
+# to both while scanning
+STRUCTURAL = re.compile(r'["{}\[\]]')
+
+
+class IncrementalParser(object):
+    """Push parser for a stream of JSON objects that arrives in chunks.
+
+    Chunks are passed to `feed` as they arrive, and every top-level object
+    that is closed by a chunk is parsed and returned straight away. Only the
+    text of the object currently being read is held on to, so memory use is
+    bounded by the largest single value rather than by the whole stream.
+    """
+
+    def __init__(self, max_depth: int = DEFAULT_MAX_DEPTH) -> None:
+        self.jp = JsonParser(max_depth=max_depth)
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        # pieces of the value currently being read, joined once it closes
+        self.pending: list[str] = []
+        self.depth = 0
+        self.in_string = False
+        # characters fed before the current chunk, and where in the stream
+        # the value being read starts, for the offsets of errors
+        self.position = 0
+        self.start = 0
+
+    def feed(self, chunk: str | bytes) -> list[dict]:
+        if not isinstance(chunk, str):
+            # multi-byte characters split across chunks are held back
+            # by the decoder until the rest of their bytes arrive
+            chunk = self.decoder.decode(chunk)
+
+        values = []
+        pos = 0
+        n = len(chunk)
+
+        while pos < n:
+            if self.depth == 0:
+                # between values, only whitespace or the start of the next
+                # object is allowed
+                while pos < n and chunk[pos] in WHITESPACE:
+                    pos += 1
+                if pos == n:
+                    break
+                if chunk[pos] != "{":
+                    raise JsonParseError(
+                        'JSON file is missing starting "{": invalid entry.',
+                        self.position + pos,
+                    )
+                self.start = self.position + pos
+
+            end = self.scan(chunk, pos)
+            if end == -1:
+                self.pending.append(chunk[pos:])
+                break
+
+            self.pending.append(chunk[pos:end])
+            values.append(self.parse_pending())
+            pos = end
+
+        self.position += n
+        return values
+
+    def scan(self, chunk: str, pos: int) -> int:
+        # returns the index just past the "}" that closes the current
+        # value (where the depth is back to 0), or -1 if the value does not
+        # close inside this chunk
+        depth = self.depth
+        in_string = self.in_string
+
+        while True:
+            if in_string:
+                pos = chunk.find('"', pos)
+                if pos == -1:
+                    break
+                in_string = False
+                pos += 1
+                continue
+
+            match = STRUCTURAL.search(chunk, pos)
+            if match is None:
+                break
+            char = match.group()
+            pos = match.end()
+
+            if char == '"':
+                in_string = True
+            elif char == "{" or char == "[":
+                depth += 1
+                # reject depth bombs before buffering the rest of them
+                if depth > self.jp.max_depth:
+                    offset = self.position + pos - 1
+                    message = f"Maximum nesting depth of {self.jp.max_depth} exceeded"
+                    self.reset()
+                    raise JsonParseError(message + ": invalid entry.", offset)
+            else:
+                depth -= 1
+                if depth == 0:
+                    self.depth = 0
+                    self.in_string = False
+                    return pos
+
+        self.depth = depth
+        self.in_string = in_string
+        return -1
+
+    def parse_pending(self) -> dict:
+        self.jp.s = "".join(self.pending)
+        self.pending.clear()
+
+        try:
+            res: dict = self.jp.parse_object()
+        except JsonParseError as e:
+            # the stream is not kept, so the error only gets its offset in
+            # the stream and no line or column
+            raise JsonParseError(str(e), self.start + e.offset) from None
+
+        # let go of the text as soon as the value is built
+        self.jp.s = ""
+
+        return res
+
+    def close(self) -> list[dict]:
+        values = self.feed(self.decoder.decode(b"", final=True))
+
+        if self.depth != 0 or self.pending:
+            offset = self.position
+            self.reset()
+            raise JsonParseError("Unexpected end of JSON input: invalid entry.", offset)
+
+        self.reset()
+        return values
+
+    def reset(self) -> None:
+        self.decoder.reset()
+        self.pending.clear()
+        self.depth = 0
+        self.in_string = False
+        self.position = 0
+
+
+def iter_json_stream(f: TextIO | BinaryIO, chunk_size: int = 65536) -> Iterator[dict]:
+    """Yield each top-level object read from a file-like object or pipe."""
+    parser = IncrementalParser()
+
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        yield from parser.feed(chunk)
+
+    yield from parser.close()
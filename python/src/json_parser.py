@@ -1,8 +1,41 @@
+import mmap
 import os
+import re
 from enum import Enum
+from typing import Any, Iterable, Iterator
+from src.cache import MISSING, KeyCache, ParseCache
+from src.columnar import ColumnarTable, parse_columnar_value
+from src.compact import CompactArray, CompactObject, build_compact
 from src.errors import JsonParseError
+from src.lazy import LazyArray, LazyObject
+from src.profiling import ParseProfile
+from src.query import Path, compile_path, select_path, step_matches
+from src.reparse import SpanIndex, index_document, reparse_edit
+from src.schema import Schema, SchemaMismatch, compile_schema
+from src.tape import build_tape, walk_tape
+from src.validate import validate_value
 
 WHITESPACE = [" ", "\n", "\t", "\r"]
+NUMBER_TERMINATORS = WHITESPACE + ["}", ",", "]"]
+
+# a number as this parser accepts it: starts with a digit or "-", and
+# holds at most one "e" or "." and at most one "-" in any order. the
+# lexeme must then be followed by the end of input or a number terminator
+NUMBER = re.compile(r"(?=[\d-])\d*(?:[e.]\d*(?:-\d*)?|-\d*(?:[e.]\d*)?)?")
+BYTE_NUMBER = re.compile(
+    rb"(?=[0-9-])[0-9]*(?:[e.][0-9]*(?:-[0-9]*)?|-[0-9]*(?:[e.][0-9]*)?)?"
+)
+
+# what 'skip_value' looks for: a whole string, a bracket, or the quote
+# that opens a string with no closing quote
+SKIP_TOKENS = re.compile(r'"[^"]*"|[{}\[\]"]')
+BYTE_SKIP_TOKENS = re.compile(rb'"[^"]*"|[{}\[\]"]')
+
+# deepest nesting of objects and arrays accepted by default
+DEFAULT_MAX_DEPTH = 10000
+
+# byte values used by 'BytesJsonParser'
+BYTE_NUMBER_TERMINATORS = frozenset(b" \n\t\r},]")
 
 
 class ReservedWords(Enum):
@@ -11,164 +44,365 @@ class ReservedWords(Enum):
     NULL = "null"
 
 
+class JsonEvent(Enum):
+    START_OBJECT = "start_object"
+    KEY = "key"
+    VALUE = "value"
+    END_OBJECT = "end_object"
+    START_ARRAY = "start_array"
+    END_ARRAY = "end_array"
+
+
+def build_value(events: Iterable[tuple[JsonEvent, Any]]) -> Any:
+    # assemble the dicts and lists described by an event stream, returning
+    # as soon as the first complete value has been built
+    stack: list = []
+    key = None
+
+    for event, val in events:
+        if event is JsonEvent.KEY:
+            key = val
+            continue
+        if event is JsonEvent.END_OBJECT or event is JsonEvent.END_ARRAY:
+            res = stack.pop()
+            if not stack:
+                return res
+            continue
+
+        if event is JsonEvent.START_OBJECT:
+            val = {}
+        elif event is JsonEvent.START_ARRAY:
+            val = []
+
+        if stack:
+            parent = stack[-1]
+            if type(parent) is dict:
+                parent[key] = val
+            else:
+                parent.append(val)
+        elif event is JsonEvent.VALUE:
+            return val
+
+        if event is not JsonEvent.VALUE:
+            stack.append(val)
+
+
 class JsonParser(object):
-    def __init__(self, s: str = "") -> None:
+    # structural tokens the grammar compares the input against;
+    # 'BytesJsonParser' swaps these for byte values
+    OPEN_OBJECT = "{"
+    CLOSE_OBJECT = "}"
+    OPEN_ARRAY = "["
+    CLOSE_ARRAY = "]"
+    COMMA = ","
+    COLON = ":"
+    QUOTE = '"'
+    WHITESPACE = WHITESPACE
+    SKIP_TOKENS = SKIP_TOKENS
+
+    def __init__(
+        self,
+        s: str = "",
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        lazy: bool = False,
+        key_cache: KeyCache | None = None,
+        columnar: bool = False,
+        compact: bool = False,
+        result_cache: ParseCache | None = None,
+        profile: ParseProfile | None = None,
+    ) -> None:
+        # the input buffer is never modified while parsing; all parse_*
+        # methods only move 'self.ptr' forward over it
+        self.buf = s
         self.ptr = 0
-        self.s = s
+        self.max_depth = max_depth
+        # when set, objects and arrays are returned as proxies over 'buf'
+        # that are only decoded when accessed (see src/lazy.py)
+        self.lazy = lazy
+        # when set, object keys are interned through this cache, which
+        # persists across parse calls
+        self.key_cache = key_cache
+        # when set, arrays of objects that all have the same keys are
+        # returned as ColumnarTables (see src/columnar.py)
+        self.columnar = columnar
+        # when set, objects and arrays are returned as read-only views over
+        # a flat CompactTree instead of dicts and lists (see src/compact.py)
+        self.compact = compact
+        # when set, 'parse_json' results are memoized in this cache. it may
+        # be shared between parsers created with the same options
+        self.result_cache = result_cache
+        # when set, calls to the parse_* methods of this parser are counted
+        # and timed into this profile (see src/profiling.py)
+        self.profile = profile
+        if profile is not None:
+            profile.attach(self)
+
+    @property
+    def s(self) -> str:
+        # remaining (unconsumed) input, only copied out when asked for
+        return self.buf[self.ptr :]
+
+    @s.setter
+    def s(self, s: str) -> None:
+        self.buf = s
+        self.reset_ptr()
 
     def reset_ptr(self) -> None:
         self.ptr = 0
 
+    def error(self, message: str, offset: int | None = None) -> JsonParseError:
+        # an error at 'offset' (by default the cursor) in the input. its line
+        # and column are only worked out if they are asked for
+        return JsonParseError(message, self.ptr if offset is None else offset, self.buf)
+
     def skip_whitespace(self) -> None:
-        for char in self.s:
-            if char in WHITESPACE:
-                self.ptr += 1
-            else:
-                break
+        buf = self.buf
+        ptr = self.ptr
+        n = len(buf)
 
-        self.s = self.s[self.ptr :]
+        while ptr < n and buf[ptr] in self.WHITESPACE:
+            ptr += 1
 
-        self.reset_ptr()
+        self.ptr = ptr
 
     def parse_comma(self) -> None:
-        if self.s[0] != ",":
+        if self.buf[self.ptr] != self.COMMA:
             return
 
-        self.s = self.s[1:]
+        start = self.ptr
+        self.ptr += 1
         self.skip_whitespace()
 
         # if we encounter a closing bracket immediately
         # following a comma, the JSON is invalid
-        if self.s[0] == "}":
-            raise JsonParseError("Trailing commas are not allowed.")
+        if self.buf[self.ptr] == self.CLOSE_OBJECT:
+            raise self.error("Trailing commas are not allowed.", start)
 
     def parse_colon(self) -> None:
-        if self.s[0] != ":":
+        if self.buf[self.ptr] != self.COLON:
             return
 
-        self.s = self.s[1:]
-        self.skip_whitespace()
-
-    def parse_object(self) -> None | dict:
-        res = {}
+        self.ptr += 1
         self.skip_whitespace()
 
-        if self.s[0] != "{":
+    def iter_events(self, depth: int = 0) -> Iterator[tuple[JsonEvent, Any]]:
+        # yield the events for the single value at the cursor; the value is
+        # consumed as the events are pulled, so nothing is built up in memory.
+        # open containers are tracked on an explicit stack (True for objects,
+        # False for arrays) rather than by recursing, so the depth of the
+        # document is only limited by 'self.max_depth'. 'depth' is the number
+        # of containers already open around the value
+        buf = self.buf
+        stack: list[bool] = []
+        max_depth = self.max_depth
+        limit = max_depth - depth
+        open_object = self.OPEN_OBJECT
+        open_array = self.OPEN_ARRAY
+        close_object = self.CLOSE_OBJECT
+        close_array = self.CLOSE_ARRAY
+        quote = self.QUOTE
+
+        while True:
+            char = buf[self.ptr]
+
+            if char == open_object or char == open_array:
+                if len(stack) >= limit:
+                    raise self.error(
+                        f"Maximum nesting depth of {max_depth} exceeded: invalid entry."
+                    )
+                self.ptr += 1
+                if char == open_object:
+                    stack.append(True)
+                    yield JsonEvent.START_OBJECT, None
+                else:
+                    stack.append(False)
+                    yield JsonEvent.START_ARRAY, None
+                self.skip_whitespace()
+            else:
+                if char == quote:
+                    item = self.parse_string()
+                else:
+                    item = self.parse_number()
+                if item is None:
+                    item = self.parse_reserved_word()
+                if item is None:
+                    raise self.error("Value unable to be parsed: invalid entry.")
+                yield JsonEvent.VALUE, item
+                if not stack:
+                    return
+                self.skip_whitespace()
+                self.parse_comma()
+
+            # close every container that ends here, then stop at the
+            # start of the next value
+            while True:
+                if stack[-1]:
+                    if buf[self.ptr] != close_object:
+                        key = self.parse_key()
+                        self.skip_whitespace()
+                        self.parse_colon()
+                        # now that we've successfully parsed a key and colon,
+                        # parse the corresponding value for this key
+                        yield JsonEvent.KEY, key
+                        break
+                elif buf[self.ptr] != close_array:
+                    break
+
+                # step past the closing bracket
+                self.ptr += 1
+                if stack.pop():
+                    yield JsonEvent.END_OBJECT, None
+                else:
+                    yield JsonEvent.END_ARRAY, None
+                if not stack:
+                    return
+                self.skip_whitespace()
+                self.parse_comma()
+
+    def skip_value(self) -> None:
+        # move the cursor past the value at the cursor without building it.
+        # strings and containers are skipped by scanning for quotes and
+        # brackets, so the inside of a skipped container is only checked
+        # for closed strings and balanced brackets
+        buf = self.buf
+        char = buf[self.ptr]
+
+        if char not in (self.QUOTE, self.OPEN_OBJECT, self.OPEN_ARRAY):
+            if self.parse_number() is None and self.parse_reserved_word() is None:
+                raise self.error("Value unable to be parsed: invalid entry.")
             return
 
-        self.s = self.s[1:]
-        self.skip_whitespace()
+        tokens = self.SKIP_TOKENS
+        quote = self.QUOTE
+        open_object = self.OPEN_OBJECT
+        open_array = self.OPEN_ARRAY
+        depth = 0
+        pos = self.ptr
+
+        while True:
+            match = tokens.search(buf, pos)
+            if match is None:
+                raise self.error(
+                    "Unexpected end of JSON input: invalid entry.", len(buf)
+                )
+            start = match.start()
+            pos = match.end()
+            char = buf[start]
+
+            if char == quote:
+                if pos - start == 1:
+                    raise self.error("String is missing close quote.", start)
+            elif char == open_object or char == open_array:
+                depth += 1
+            else:
+                depth -= 1
 
-        while self.s[0] != "}":
-            key = self.parse_string()
-            if key is None:
-                raise JsonParseError("Keys must be valid strings.")
-            self.skip_whitespace()
-            self.parse_colon()
-            # now that we've successfully parsed a key and colon,
-            # parse the corresponding value for this key
-            val = self.parse_value()
-            self.skip_whitespace()
-            self.parse_comma()
-            res[key] = val
+            if depth == 0:
+                break
 
-        # drop final closing bracket
-        self.s = self.s[1:]
+        self.ptr = pos
 
-        return res
+    def build(self, depth: int = 0) -> Any:
+        # build the value at the cursor from its event stream
+        return build_value(self.iter_events(depth))
 
-    def parse_list(self) -> None | list:
-        res = []
+    def parse_object(self) -> None | dict | LazyObject | CompactObject:
         self.skip_whitespace()
 
-        if self.s[0] != "[":
+        if self.buf[self.ptr] != self.OPEN_OBJECT:
             return
 
-        self.s = self.s[1:]
+        if self.lazy:
+            return LazyObject(*self.skip_lazy())
+        if self.columnar:
+            return parse_columnar_value(self)
+        if self.compact:
+            return build_compact(self.iter_events())
+
+        return self.build()
+
+    def parse_list(
+        self,
+    ) -> None | list | LazyArray | ColumnarTable | CompactArray:
         self.skip_whitespace()
 
-        while self.s[0] != "]":
-            elem = self.parse_value()
-            self.skip_whitespace()
-            self.parse_comma()
-            res.append(elem)
+        if self.buf[self.ptr] != self.OPEN_ARRAY:
+            return
 
-        # drop final closing square bracket
-        self.s = self.s[1:]
+        if self.lazy:
+            return LazyArray(*self.skip_lazy())
+        if self.columnar:
+            return parse_columnar_value(self)
+        if self.compact:
+            return build_compact(self.iter_events())
 
-        return res
+        return self.build()
+
+    def skip_lazy(self) -> tuple["JsonParser", int, int]:
+        # record where the container at the cursor starts and ends, for a
+        # lazy proxy. the proxy gets its own parser over the same buffer so
+        # that this one can go on to parse other input
+        start = self.ptr
+        self.skip_value()
+        jp = type(self)(self.buf, self.max_depth, True, self.key_cache)
+        return jp, start, self.ptr
 
     def parse_string(self) -> None | str:
-        res = ""
+        buf = self.buf
 
-        if self.s[0] != '"':
+        if buf[self.ptr] != '"':
             return
 
-        self.ptr += 1
+        start = self.ptr + 1
+        end = buf.find('"', start)
 
-        while self.s[self.ptr] != '"':
-            char = self.s[self.ptr]
-            res += char
-            self.ptr += 1
+        # no closing quotation encountered, invalid JSON format
+        if end == -1:
+            raise self.error("String is missing close quote.")
 
-            # no closing quotation encountered, invalid JSON format
-            if self.ptr >= len(self.s):
-                raise JsonParseError("String is missing close quote.")
+        # advance ptr past the closing quote
+        self.ptr = end + 1
 
-        # advance ptr on input string json
-        self.s = self.s[self.ptr + 1 :]
+        return buf[start:end]
 
-        self.reset_ptr()
+    def parse_key(self) -> str:
+        key = self.parse_string()
 
-        return res
+        if key is None:
+            raise self.error("Keys must be valid strings.")
+        if self.key_cache is not None:
+            key = self.key_cache.intern(key)
+
+        return key
 
     def parse_reserved_word(self) -> None | str | bool:
-        if self.s[:4] == ReservedWords.TRUE.value:
-            self.s = self.s[len(ReservedWords.TRUE.value) :]
+        if self.buf.startswith(ReservedWords.TRUE.value, self.ptr):
+            self.ptr += len(ReservedWords.TRUE.value)
             return True
-        elif self.s[:5] == ReservedWords.FALSE.value:
-            self.s = self.s[len(ReservedWords.FALSE.value) :]
+        elif self.buf.startswith(ReservedWords.FALSE.value, self.ptr):
+            self.ptr += len(ReservedWords.FALSE.value)
             return False
-        elif self.s[:4] == ReservedWords.NULL.value:
-            self.s = self.s[len(ReservedWords.NULL.value) :]
+        elif self.buf.startswith(ReservedWords.NULL.value, self.ptr):
+            self.ptr += len(ReservedWords.NULL.value)
             return ReservedWords.NULL.value
         else:
             return
 
     def parse_number(self) -> None | int | float:
-        res = ""
-        first_char = self.s[0]
-        e_or_dot_counter = 0
-        neg_counter = 0
+        buf = self.buf
 
-        if not first_char.isdigit() and first_char != "-":
+        # find the whole lexeme in one step instead of a char at a time
+        match = NUMBER.match(buf, self.ptr)
+        if match is None:
+            return
+        end = match.end()
+        if end < len(buf) and buf[end] not in NUMBER_TERMINATORS:
             return
-
-        # parse one char at a time until the string 's' is empty,
-        # or until we trigger a reason to break or return 'None'
-        for char in self.s:
-            if char.isdigit():
-                res += char
-                self.ptr += 1
-            elif char in {"e", "."} and e_or_dot_counter == 0:
-                res += char
-                e_or_dot_counter += 1
-                self.ptr += 1
-            elif char == "-" and neg_counter == 0:
-                res += char
-                neg_counter += 1
-                self.ptr += 1
-            elif char in WHITESPACE + ["}", ",", "]"]:
-                # end of number encountered, break and return the number
-                break
-            else:
-                self.reset_ptr()
-                return
 
         # advance ptr on input string
-        self.s = self.s[self.ptr :]
-        self.reset_ptr()
-        return int(float(res)) if float(res) % 1 == 0 else float(res)
+        self.ptr = end
+        res = float(match.group())
+        return int(res) if res.is_integer() else res
 
     def parse_value(self) -> None | int | float | str | bool | list | dict:
         item = self.parse_string()
@@ -182,11 +416,11 @@ class JsonParser(object):
         if item is None:
             item = self.parse_list()
         if item is None:
-            raise JsonParseError("Value unable to be parsed: invalid entry.")
+            raise self.error("Value unable to be parsed: invalid entry.")
 
         return item
 
-    def parse_json(self, s: str) -> dict:
+    def load_input(self, s: str) -> None:
         if os.path.exists(s):
             f = open(s, "r")
             self.s = f.read()
@@ -194,14 +428,323 @@ class JsonParser(object):
         else:
             self.s = s
 
+    def check_document(self) -> None:
         self.skip_whitespace()
 
         # do basic checks before parsing
-        if len(self.s) == 0:
-            raise JsonParseError("Empty JSON file detected: invalid entry.")
-        if self.s[0] != "{":
-            raise JsonParseError('JSON file is missing starting "{": invalid entry.')
+        if self.ptr >= len(self.buf):
+            raise self.error("Empty JSON file detected: invalid entry.")
+        if self.buf[self.ptr] != self.OPEN_OBJECT:
+            raise self.error('JSON file is missing starting "{": invalid entry.')
+
+    def select_value(
+        self, paths: list[Path], active: list[tuple[int, int]], matches: list[list]
+    ) -> None:
+        # walk the value at the cursor for every (path, step) pair in
+        # 'active'. values are only built once a path is fully matched;
+        # subtrees no path leads into are skipped
+        if not active:
+            self.skip_value()
+            return
+
+        if any(step == len(paths[i]) for i, step in active):
+            value = self.build()
+            for i, step in active:
+                matches[i].extend(select_path(value, paths[i][step:]))
+            return
+
+        char = self.buf[self.ptr]
+
+        if char == self.OPEN_OBJECT:
+            self.ptr += 1
+            self.skip_whitespace()
+            while self.buf[self.ptr] != self.CLOSE_OBJECT:
+                key = self.parse_key()
+                self.skip_whitespace()
+                self.parse_colon()
+                child = [
+                    (i, step + 1)
+                    for i, step in active
+                    if step_matches(paths[i][step], key)
+                ]
+                self.select_value(paths, child, matches)
+                self.skip_whitespace()
+                self.parse_comma()
+            self.ptr += 1
+        elif char == self.OPEN_ARRAY:
+            self.ptr += 1
+            self.skip_whitespace()
+            index = 0
+            while self.buf[self.ptr] != self.CLOSE_ARRAY:
+                child = [
+                    (i, step + 1)
+                    for i, step in active
+                    if step_matches(paths[i][step], index)
+                ]
+                self.select_value(paths, child, matches)
+                self.skip_whitespace()
+                self.parse_comma()
+                index += 1
+            self.ptr += 1
+        else:
+            # a scalar has nothing left for the remaining steps to select
+            self.skip_value()
+
+    def query_json(self, s: str, paths: list[str]) -> dict[str, list]:
+        # return the values each path expression selects, e.g.
+        # {"$.user.id": [42], "$.items[*].price": [1.5, 3]}, reading the
+        # input once and without building the parts nothing selects
+        compiled = [compile_path(p) for p in paths]
+        matches: list[list] = [[] for _ in paths]
+
+        self.load_input(s)
+        self.check_document()
+        self.select_value(compiled, [(i, 0) for i in range(len(paths))], matches)
+
+        return dict(zip(paths, matches))
+
+    def parse_json(self, s: str) -> dict:
+        cache = self.result_cache
+        if cache is not None:
+            options = (type(self), self.lazy, self.columnar, self.compact)
+            key = cache.make_key(s, options + (self.max_depth,))
+            res = cache.get(key)
+            if res is not MISSING:
+                return res
+
+        self.load_input(s)
+        self.check_document()
+
+        res = self.parse_object()
+
+        if cache is not None:
+            cache.put(key, res)
+
+        return res
+
+    def parse_text(self, s: str) -> dict:
+        # like 'parse_json', but 's' is always JSON text and never a file path
+        self.s = s
+        self.check_document()
 
         res: dict = self.parse_object()
 
         return res
+
+    def parse_schema(self, s: str, schema: Schema | type | dict) -> Any:
+        # decode 's' straight into the typed value 'schema' describes (see
+        # src/schema.py). a document of any other shape is parsed again by
+        # 'parse_object', so it gives what 'parse_text' would, errors included
+        decode = compile_schema(schema).decode
+        self.s = s
+        self.check_document()
+
+        start = self.ptr
+        try:
+            return decode(self, 0)
+        except (SchemaMismatch, JsonParseError, IndexError, RecursionError):
+            self.ptr = start
+
+        res: dict = self.parse_object()
+
+        return res
+
+    def validate(self, s: str) -> JsonParseError | None:
+        # check that 's' would parse, without building it (see
+        # src/validate.py). returns None for valid input, and otherwise the
+        # JsonParseError parsing would raise
+        self.s = s
+        try:
+            self.check_document()
+            validate_value(self)
+        except JsonParseError as e:
+            return e
+
+        return None
+
+    def parse_indexed(self, s: str) -> tuple[dict, SpanIndex]:
+        # like 'parse_text', but also return where each object and array is
+        # in 's', for 'reparse'. values are always plain dicts and lists
+        self.s = s
+        index = index_document(self)
+
+        return index.root.value, index
+
+    def reparse(
+        self, doc: dict, index: SpanIndex, offset: int, deleted: int, inserted: str
+    ) -> tuple[dict, SpanIndex]:
+        # 'doc' and its 'index' after deleting 'deleted' characters at
+        # 'offset' and inserting 'inserted' there, parsing only the part of
+        # the document the edit touched again (see src/reparse.py)
+        if doc is not index.root.value:
+            raise ValueError("The span index is not the index of this document.")
+
+        index = reparse_edit(self, index, offset, deleted, inserted)
+
+        return index.root.value, index
+
+    def parse_file(self, path: str) -> dict:
+        # like 'parse_json' for input known to be a file path, so there is
+        # no 'os.path.exists' check on the argument
+        with open(path, "r") as f:
+            return self.parse_text(f.read())
+
+    def iter_json_events(self, s: str) -> Iterator[tuple[JsonEvent, Any]]:
+        # same input handling and checks as 'parse_json', but the document is
+        # streamed out as events instead of being built into a dict
+        self.load_input(s)
+        self.check_document()
+
+        yield from self.iter_events()
+
+
+class BytesJsonParser(JsonParser):
+    """Parser over UTF-8 encoded bytes, such as a memory-mapped file.
+
+    Structural characters are matched as byte values directly on the buffer
+    and only the contents of string tokens are decoded, so the document is
+    never copied into a 'str' as a whole.
+    """
+
+    OPEN_OBJECT = ord("{")
+    CLOSE_OBJECT = ord("}")
+    OPEN_ARRAY = ord("[")
+    CLOSE_ARRAY = ord("]")
+    COMMA = ord(",")
+    COLON = ord(":")
+    QUOTE = ord('"')
+    SKIP_TOKENS = BYTE_SKIP_TOKENS
+    WHITESPACE = frozenset(b" \n\t\r")
+
+    def __init__(
+        self,
+        s: bytes = b"",
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        lazy: bool = False,
+        key_cache: KeyCache | None = None,
+        columnar: bool = False,
+        compact: bool = False,
+        result_cache: ParseCache | None = None,
+        profile: ParseProfile | None = None,
+    ) -> None:
+        super().__init__(
+            s, max_depth, lazy, key_cache, columnar, compact, result_cache, profile
+        )
+
+    def parse_string(self) -> None | str:
+        buf = self.buf
+
+        if buf[self.ptr] != self.QUOTE:
+            return
+
+        start = self.ptr + 1
+        end = buf.find(b'"', start)
+
+        # no closing quotation encountered, invalid JSON format
+        if end == -1:
+            raise self.error("String is missing close quote.")
+
+        # advance ptr past the closing quote
+        self.ptr = end + 1
+
+        return str(buf[start:end], "utf-8")
+
+    def parse_reserved_word(self) -> None | str | bool:
+        word = self.buf[self.ptr : self.ptr + 5]
+
+        if word[:4] == b"true":
+            self.ptr += len(ReservedWords.TRUE.value)
+            return True
+        elif word == b"false":
+            self.ptr += len(ReservedWords.FALSE.value)
+            return False
+        elif word[:4] == b"null":
+            self.ptr += len(ReservedWords.NULL.value)
+            return ReservedWords.NULL.value
+        else:
+            return
+
+    def parse_number(self) -> None | int | float:
+        buf = self.buf
+
+        match = BYTE_NUMBER.match(buf, self.ptr)
+        if match is None:
+            return
+        end = match.end()
+        if end < len(buf) and buf[end] not in BYTE_NUMBER_TERMINATORS:
+            return
+
+        # advance ptr on input buffer
+        self.ptr = end
+        res = float(match.group())
+        return int(res) if res.is_integer() else res
+
+    def parse_buffer(self, buf: Any) -> dict:
+        self.s = buf
+        try:
+            self.check_document()
+            res: dict = self.parse_object()
+        finally:
+            # drop the reference so the buffer can be closed or resized
+            self.s = b""
+
+        return res
+
+    def parse_bytes(self, buf: bytes | bytearray | memoryview) -> dict:
+        # parse JSON text that is already in memory as UTF-8 bytes, e.g. a
+        # network payload, without decoding it into a 'str' first
+        if isinstance(buf, memoryview):
+            # a memoryview has no 'find', so parse the object it exposes
+            # when the view covers all of it, and copy it out otherwise
+            obj = buf.obj
+            whole = isinstance(obj, (bytes, bytearray, mmap.mmap)) and (
+                buf.c_contiguous and buf.nbytes == len(obj)
+            )
+            buf = obj if whole else buf.tobytes()
+
+        return self.parse_buffer(buf)
+
+    def parse_file(self, path: str) -> dict:
+        with open(path, "rb") as f:
+            return self.parse_buffer(f.read())
+
+    def load_input(self, s: str | bytes) -> None:
+        # bytes are parsed as they are, and a 'str' is a file path or JSON
+        # text like for 'JsonParser', read or encoded into bytes
+        if isinstance(s, str):
+            if os.path.exists(s):
+                with open(s, "rb") as f:
+                    s = f.read()
+            else:
+                s = s.encode("utf-8")
+        self.s = s
+
+    def parse_tape(self, buf: bytes | bytearray | memoryview) -> dict:
+        # like 'parse_bytes', but in two stages: every structural character
+        # is indexed up front (with NumPy when it is installed), and the
+        # value is then built by walking that index (see src/tape.py)
+        self.s = buf
+        try:
+            self.check_document()
+            res: dict = walk_tape(self, build_tape(buf))
+        finally:
+            self.s = b""
+
+        return res
+
+    def parse_mmap(self, path: str) -> dict:
+        # parse a file through a read-only memory map; pages are read in by
+        # the OS as the parser reaches them instead of copying the whole file
+        with open(path, "rb") as f:
+            # an empty file cannot be mapped
+            if os.fstat(f.fileno()).st_size == 0:
+                raise JsonParseError("Empty JSON file detected: invalid entry.", 0, b"")
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                try:
+                    return self.parse_buffer(mm)
+                except JsonParseError as e:
+                    # the map is closed on the way out, so the error's line
+                    # and column are worked out while it is still open
+                    e.locate()
+                    raise
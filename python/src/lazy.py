@@ -0,0 +1,127 @@
+from collections.abc import Mapping, Sequence
+from typing import Any, Iterator
+
+
+class LazyContainer(object):
+    """Base for containers that are only decoded from the source buffer when
+    they are first accessed.
+
+    'jp' is a parser dedicated to the lazy tree, left wherever the last
+    access moved its cursor. 'start' is the offset of the opening bracket in
+    'jp.buf' and 'end' the offset just past the closing one. Members are
+    indexed on first access and each child is decoded once and then cached.
+    """
+
+    def __init__(self, jp, start: int, end: int) -> None:
+        self.jp = jp
+        self.start = start
+        self.end = end
+        self.spans: Any = None
+        self.cache: dict = {}
+
+    def decode(self, start: int, end: int) -> Any:
+        jp = self.jp
+        char = jp.buf[start]
+
+        if char == jp.OPEN_OBJECT:
+            return LazyObject(jp, start, end)
+        if char == jp.OPEN_ARRAY:
+            return LazyArray(jp, start, end)
+
+        jp.ptr = start
+        return jp.parse_value()
+
+    def skip_member_value(self) -> tuple[int, int]:
+        jp = self.jp
+        start = jp.ptr
+        jp.skip_value()
+        end = jp.ptr
+        jp.skip_whitespace()
+        jp.parse_comma()
+        return start, end
+
+    def to_python(self) -> Any:
+        # decode the whole container into plain dicts and lists
+        self.jp.ptr = self.start
+        return self.jp.build()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_python()!r})"
+
+
+class LazyObject(LazyContainer, Mapping):
+    def index(self) -> dict[str, tuple[int, int]]:
+        if self.spans is not None:
+            return self.spans
+
+        jp = self.jp
+        spans = {}
+        jp.ptr = self.start + 1
+        jp.skip_whitespace()
+
+        while jp.buf[jp.ptr] != jp.CLOSE_OBJECT:
+            key = jp.parse_key()
+            jp.skip_whitespace()
+            jp.parse_colon()
+            spans[key] = self.skip_member_value()
+
+        self.spans = spans
+        return spans
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.cache:
+            return self.cache[key]
+
+        val = self.decode(*self.index()[key])
+        self.cache[key] = val
+        return val
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.index())
+
+    def __len__(self) -> int:
+        return len(self.index())
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.index()
+
+
+class LazyArray(LazyContainer, Sequence):
+    def index(self) -> list[tuple[int, int]]:
+        if self.spans is not None:
+            return self.spans
+
+        jp = self.jp
+        spans = []
+        jp.ptr = self.start + 1
+        jp.skip_whitespace()
+
+        while jp.buf[jp.ptr] != jp.CLOSE_ARRAY:
+            spans.append(self.skip_member_value())
+
+        self.spans = spans
+        return spans
+
+    def __getitem__(self, i: int | slice) -> Any:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+
+        spans = self.index()
+        if i < 0:
+            i += len(spans)
+        if not 0 <= i < len(spans):
+            raise IndexError("LazyArray index out of range")
+        if i in self.cache:
+            return self.cache[i]
+
+        val = self.decode(*spans[i])
+        self.cache[i] = val
+        return val
+
+    def __len__(self) -> int:
+        return len(self.index())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
@@ -0,0 +1,135 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterator, NamedTuple
+from src.cache import KeyCache
+from src.errors import JsonParseError
+from src.json_parser import WHITESPACE, JsonParser
+
+# shards are kept small enough that several of them go to each worker,
+# which evens out the load when some lines are much longer than others
+DEFAULT_SHARD_SIZE = 8 * 1024 * 1024
+
+
+class Shard(NamedTuple):
+    index: int
+    start: int  # byte offset of the first line in the shard
+    end: int  # byte offset just past the last line in the shard
+    first_line: int  # 1-based line number of the line at 'start'
+
+
+class NdjsonRecord(NamedTuple):
+    line: int
+    value: dict | None
+    error: str | None
+
+
+class ShardResult(NamedTuple):
+    shard: Shard
+    records: list[NdjsonRecord]
+
+    @property
+    def errors(self) -> list[NdjsonRecord]:
+        return [r for r in self.records if r.error is not None]
+
+
+def split_shards(path: str, shard_size: int = DEFAULT_SHARD_SIZE) -> list[Shard]:
+    size = os.path.getsize(path)
+    bounds = [0]
+
+    with open(path, "rb") as f:
+        # move each split point forward to the start of the next line
+        target = shard_size
+        while target < size:
+            f.seek(target)
+            f.readline()
+            pos = f.tell()
+            if pos >= size:
+                break
+            bounds.append(pos)
+            target = pos + shard_size
+        bounds.append(size)
+
+        # count the newlines in each shard so that workers can report
+        # absolute line numbers, even when results come back out of order
+        shards = []
+        first_line = 1
+        f.seek(0)
+        for i, (start, end) in enumerate(zip(bounds, bounds[1:])):
+            shards.append(Shard(i, start, end, first_line))
+            remaining = end - start
+            while remaining > 0:
+                block = f.read(min(remaining, 1024 * 1024))
+                first_line += block.count(b"\n")
+                remaining -= len(block)
+
+    return shards
+
+
+def parse_line(jp: JsonParser, line: str) -> dict:
+    res = jp.parse_text(line)
+
+    # each line must hold exactly one object
+    jp.skip_whitespace()
+    if jp.ptr != len(jp.buf):
+        raise JsonParseError("Unexpected data after JSON object: invalid entry.")
+
+    return res
+
+
+def parse_shard(path: str, shard: Shard) -> ShardResult:
+    # records in a log file mostly repeat the same keys, so share one str
+    # per key across the shard
+    jp = JsonParser(key_cache=KeyCache())
+    records = []
+
+    with open(path, "rb") as f:
+        f.seek(shard.start)
+        data = f.read(shard.end - shard.start)
+
+    for i, raw in enumerate(data.split(b"\n")):
+        line_no = shard.first_line + i
+        try:
+            line = raw.decode("utf-8")
+            if all(char in WHITESPACE for char in line):
+                continue
+            records.append(NdjsonRecord(line_no, parse_line(jp, line), None))
+        except IndexError:
+            # the line ended in the middle of a value
+            records.append(
+                NdjsonRecord(
+                    line_no, None, "Unexpected end of JSON input: invalid entry."
+                )
+            )
+        except (JsonParseError, ValueError) as e:
+            records.append(NdjsonRecord(line_no, None, str(e)))
+
+    return ShardResult(shard, records)
+
+
+def parse_ndjson(
+    path: str,
+    workers: int | None = None,
+    ordered: bool = True,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+) -> Iterator[ShardResult]:
+    """Parse a JSON Lines file, one shard per task in a process pool.
+
+    Shard results are yielded in file order when 'ordered' is set, and as
+    soon as each one finishes otherwise. Lines that fail to parse are
+    reported as records with an error instead of stopping the run.
+    """
+    shards = split_shards(path, shard_size)
+
+    # a single shard is not worth the cost of starting a pool
+    if len(shards) == 1 or workers == 1:
+        for shard in shards:
+            yield parse_shard(path, shard)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        if ordered:
+            yield from executor.map(parse_shard, [path] * len(shards), shards)
+        else:
+            futures = [executor.submit(parse_shard, path, shard) for shard in shards]
+            for future in as_completed(futures):
+                yield future.result()
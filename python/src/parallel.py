@@ -0,0 +1,279 @@
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, NamedTuple
+from src.errors import JsonParseError
+from src.json_parser import DEFAULT_MAX_DEPTH, BytesJsonParser
+
+# files smaller than this are parsed in the calling process, since starting
+# the pool would take longer than the parse
+DEFAULT_PARALLEL_THRESHOLD = 4 * 1024 * 1024
+
+# the split container is cut into this many chunks per worker, which evens
+# out the load when some members are much larger than others
+CHUNKS_PER_WORKER = 4
+
+# how many levels of single large members are looked through for a
+# container with enough members to split
+MAX_SPLIT_DEPTH = 16
+
+# strings (which have no escapes), brackets and commas; a lone quote is a
+# string that is never closed
+STRUCTURAL = re.compile(rb'"[^"]*"|[\[\]{},]|"')
+
+QUOTE = ord('"')
+COMMA = ord(",")
+OPENERS = frozenset(b"[{")
+
+
+class Split(NamedTuple):
+    path: list[str | int]  # keys and indices leading to the split container
+    start: int  # offset of the container's opening bracket
+    end: int  # offset just past its closing bracket
+    is_object: bool
+    # (start, end) of each member: the text between the container's
+    # top-level commas, with the key of an object member included
+    members: list[tuple[int, int]]
+
+
+def index_container(buf: Any, start: int) -> tuple[list[tuple[int, int]], int]:
+    # the structural index of the container whose opening bracket is at
+    # 'start': one pass over its strings, brackets and commas that records
+    # where its top-level commas are and where it ends
+    commas = []
+    depth = 0
+
+    for match in STRUCTURAL.finditer(buf, start):
+        pos = match.start()
+        char = buf[pos]
+
+        if char == QUOTE:
+            if match.end() - pos == 1:
+                raise JsonParseError("String is missing close quote.", pos, buf)
+        elif char == COMMA:
+            if depth == 1:
+                commas.append(pos)
+        elif char in OPENERS:
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                bounds = [start] + commas + [pos]
+                members = [(a + 1, b) for a, b in zip(bounds, bounds[1:])]
+                return members, pos + 1
+
+    message = "Unexpected end of JSON input: invalid entry."
+    raise JsonParseError(message, len(buf), buf)
+
+
+def is_blank(buf: Any, start: int, end: int) -> bool:
+    whitespace = BytesJsonParser.WHITESPACE
+    return all(char in whitespace for char in buf[start:end])
+
+
+def trim_members(
+    buf: Any, members: list[tuple[int, int]], is_object: bool
+) -> list[tuple[int, int]]:
+    # a blank last member is either an empty container or follows a comma
+    # before the closing bracket, which the parser only rejects in objects
+    if not is_blank(buf, *members[-1]):
+        return members
+    if len(members) > 1 and is_object:
+        # the comma is just before the blank member
+        comma = members[-1][0] - 1
+        raise JsonParseError("Trailing commas are not allowed.", comma, buf)
+    return members[:-1]
+
+
+def find_split(jp: BytesJsonParser, workers: int) -> Split:
+    # start at the root object and, while a container has too few members
+    # to share out but one member holds most of it (e.g. {"rows": [...]}),
+    # move down into that member
+    buf = jp.buf
+    start = jp.ptr
+    members, end = index_container(buf, start)
+    split = Split([], start, end, True, trim_members(buf, members, True))
+
+    while len(split.path) < MAX_SPLIT_DEPTH:
+        members = split.members
+        if len(members) >= workers * CHUNKS_PER_WORKER or not members:
+            break
+
+        keys: list[str | int] = list(range(len(members)))
+        if split.is_object:
+            keys = []
+            for member_start, _ in members:
+                jp.ptr = member_start
+                jp.skip_whitespace()
+                keys.append(jp.parse_key())
+
+        i = max(range(len(members)), key=lambda i: members[i][1] - members[i][0])
+        member_start, member_end = members[i]
+        if (member_end - member_start) * 2 < split.end - split.start:
+            break
+        # with a repeated key only the last value is kept, so it can't be
+        # told apart from the others when stitching
+        if keys.count(keys[i]) > 1:
+            break
+
+        jp.ptr = member_start
+        jp.skip_whitespace()
+        if split.is_object:
+            jp.parse_key()
+            jp.skip_whitespace()
+            jp.parse_colon()
+        char = buf[jp.ptr]
+        if char != jp.OPEN_OBJECT and char != jp.OPEN_ARRAY:
+            break
+
+        # the member must be this one value (commas are optional, so a
+        # member can hold several)
+        child_start = jp.ptr
+        child_members, child_end = index_container(buf, child_start)
+        if not is_blank(buf, child_end, member_end):
+            break
+
+        is_object = char == jp.OPEN_OBJECT
+        split = Split(
+            split.path + [keys[i]],
+            child_start,
+            child_end,
+            is_object,
+            trim_members(buf, child_members, is_object),
+        )
+
+    return split
+
+
+def make_chunks(members: list[tuple[int, int]], n: int) -> list[tuple[int, int]]:
+    # group consecutive members into about 'n' byte ranges of similar size
+    target = max(1, (members[-1][1] - members[0][0]) // n)
+    chunks = []
+    first = None
+
+    for start, end in members:
+        if first is None:
+            first = start
+        if end - first >= target:
+            chunks.append((first, end))
+            first = None
+
+    if first is not None:
+        chunks.append((first, members[-1][1]))
+
+    return chunks
+
+
+def parse_chunk(
+    path: str, start: int, end: int, is_object: bool, max_depth: int
+) -> dict | list:
+    # parse a run of members of the split container as a container of its own
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    if is_object:
+        jp = BytesJsonParser(b"{" + data + b"}", max_depth)
+    else:
+        jp = BytesJsonParser(b"[" + data + b"]", max_depth)
+
+    try:
+        return jp.parse_object() if is_object else jp.parse_list()
+    except JsonParseError as e:
+        # the offset in the file, less the bracket added in front. the
+        # parent works out the line and column from the file
+        raise JsonParseError(str(e), start + e.offset - 1) from None
+
+
+def locate_in_file(path: str, message: str, offset: int) -> JsonParseError:
+    # an error at 'offset' in the file, with its line and column worked out
+    error = JsonParseError(message, offset)
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            error.source = mm
+            error.locate()
+    return error
+
+
+def parse_parallel(
+    path: str,
+    workers: int | None = None,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+    threshold: int = DEFAULT_PARALLEL_THRESHOLD,
+) -> dict:
+    """Parse one large JSON file across a pool of worker processes.
+
+    A first pass over a memory map of the file indexes the top-level commas
+    of the container to split: the root object, or the large container most
+    of it is made of. Runs of its members are then parsed by the workers
+    from their own byte ranges of the file while the rest of the document
+    is parsed here, and the results are stitched back together in order.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or os.path.getsize(path) < threshold:
+        return BytesJsonParser(max_depth=max_depth).parse_mmap(path)
+
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            jp = BytesJsonParser(mm, max_depth)
+            try:
+                jp.check_document()
+                split = find_split(jp, workers)
+                # the document with the split container left empty
+                empty = b"{}" if split.is_object else b"[]"
+                outer = mm[: split.start] + empty + mm[split.end :]
+            except JsonParseError:
+                # the first pass doesn't check scalars, so an invalid one
+                # before this error is only found by parsing in order
+                split = None
+            finally:
+                jp.s = b""
+
+    if split is None or len(split.members) < 2:
+        return BytesJsonParser(max_depth=max_depth).parse_mmap(path)
+
+    chunks = make_chunks(split.members, workers * CHUNKS_PER_WORKER)
+    depth = max_depth - len(split.path)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(parse_chunk, path, start, end, split.is_object, depth)
+            for start, end in chunks
+        ]
+        error = None
+        try:
+            res: Any = BytesJsonParser(max_depth=max_depth).parse_bytes(outer)
+        except JsonParseError as e:
+            offset = e.offset
+            if offset >= split.start + len(empty):
+                # past the emptied container in 'outer'
+                offset += split.end - split.start - len(empty)
+            error = locate_in_file(path, str(e), offset)
+            if offset < split.start:
+                raise error from None
+
+        # an error in the split container comes before one after it
+        try:
+            parts = [future.result() for future in futures]
+        except JsonParseError as e:
+            raise locate_in_file(path, str(e), e.offset) from None
+        if error is not None:
+            raise error from None
+
+    container: Any = {} if split.is_object else []
+    for part in parts:
+        if split.is_object:
+            container.update(part)
+        else:
+            container.extend(part)
+
+    if not split.path:
+        return container
+
+    parent = res
+    for key in split.path[:-1]:
+        parent = parent[key]
+    parent[split.path[-1]] = container
+
+    return res
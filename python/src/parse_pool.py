@@ -0,0 +1,116 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterable
+from src.json_parser import DEFAULT_MAX_DEPTH, BytesJsonParser, JsonParser
+
+# documents shorter than this are parsed straight away in the calling thread;
+# below it, handing a document to a worker costs more than parsing it
+DEFAULT_INLINE_THRESHOLD = 64 * 1024
+
+Document = str | bytes | bytearray | memoryview
+
+
+def parse_document(doc: Document, max_depth: int = DEFAULT_MAX_DEPTH) -> dict:
+    # a JsonParser keeps its cursor on the instance, so every call gets a
+    # parser of its own; this makes the function safe to call from any
+    # number of threads or coroutines at once
+    if isinstance(doc, str):
+        return JsonParser(max_depth=max_depth).parse_text(doc)
+    return BytesJsonParser(max_depth=max_depth).parse_bytes(doc)
+
+
+class ParsePool(object):
+    """Parses JSON text on a pool of worker threads or processes.
+
+    Documents of at least 'inline_threshold' characters (or bytes) go to the
+    pool, and shorter ones are parsed in the calling thread. Processes give
+    real parallelism at the cost of sending each document and result
+    between processes; threads avoid that cost and keep an event loop
+    responsive, but only run in parallel on a free-threaded build.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        processes: bool = False,
+        inline_threshold: int = DEFAULT_INLINE_THRESHOLD,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+    ) -> None:
+        executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        self.executor: Executor = executor(max_workers=workers)
+        self.processes = processes
+        self.inline_threshold = inline_threshold
+        self.max_depth = max_depth
+
+    def submit_document(self, doc: Document):
+        # memoryviews cannot be sent to another process
+        if self.processes and isinstance(doc, memoryview):
+            doc = doc.tobytes()
+        return self.executor.submit(parse_document, doc, self.max_depth)
+
+    def parse_many(self, docs: Iterable[Document]) -> list[dict]:
+        # results are returned in the order of 'docs'. the first document
+        # that fails to parse raises its error once all of them are done
+        docs = list(docs)
+        futures = {
+            i: self.submit_document(doc)
+            for i, doc in enumerate(docs)
+            if len(doc) >= self.inline_threshold
+        }
+
+        # the short documents are parsed while the pool works on the rest
+        results: list = [None] * len(docs)
+        error = None
+        for i, doc in enumerate(docs):
+            try:
+                if i in futures:
+                    results[i] = futures[i].result()
+                else:
+                    results[i] = parse_document(doc, self.max_depth)
+            except Exception as e:
+                error = error or e
+
+        if error is not None:
+            raise error
+
+        return results
+
+    async def parse_async(self, doc: Document) -> dict:
+        if len(doc) < self.inline_threshold:
+            return parse_document(doc, self.max_depth)
+        return await asyncio.wrap_future(self.submit_document(doc))
+
+    def close(self) -> None:
+        self.executor.shutdown()
+
+    def __enter__(self) -> "ParsePool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def parse_many(
+    docs: Iterable[Document],
+    workers: int | None = None,
+    processes: bool = True,
+    inline_threshold: int = DEFAULT_INLINE_THRESHOLD,
+) -> list[dict]:
+    # one-off batch on a pool that is shut down afterwards; keep a ParsePool
+    # around instead when batches are parsed repeatedly
+    with ParsePool(workers, processes, inline_threshold) as pool:
+        return pool.parse_many(docs)
+
+
+async def parse_async(
+    doc: Document,
+    inline_threshold: int = DEFAULT_INLINE_THRESHOLD,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+) -> dict:
+    # parse without blocking the event loop: short documents are parsed
+    # inline, longer ones on the loop's default thread pool
+    if len(doc) < inline_threshold:
+        return parse_document(doc, max_depth)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, parse_document, doc, max_depth)
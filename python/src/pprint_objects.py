@@ -1,42 +1,187 @@
-def pprint_dict(d: dict, depth: int = 0) -> None:
-    print("{")
-    for k, v in d.items():
-        print(f'{" " * (depth + 1) * 4}"{k}": ', end="")
-        if isinstance(v, dict):
-            depth += 1
-            pprint_dict(v, depth)
-            depth -= 1
-        elif isinstance(v, list):
-            depth += 1
-            pprint_list(L=v, is_in_array=False, depth=depth)
-            depth -= 1
-        elif isinstance(v, str):
-            print(f'"{v}",')
-        else:
-            print(f"{v},")
-    print(" " * depth * 4, end="")
-    if depth == 0:
-        print("}")
-    else:
-        print("},")
-
-
-def pprint_list(L: list, is_in_array: bool, depth: int = 0) -> None:
-    if is_in_array:
-        print(" " * depth * 4, end="")
-    print("[")
-    for elem in L:
-        if isinstance(elem, dict):
-            depth += 1
-            pprint_dict(elem, depth)
-            depth -= 1
-        elif isinstance(elem, list):
-            depth += 1
-            pprint_list(L=elem, is_in_array=True, depth=depth)
-            depth -= 1
-        elif isinstance(elem, str):
-            print(f'{" " * (depth + 1) * 4}"{elem}",')
+import re
+import sys
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import Any, TextIO
+
+# output is handed to the file in pieces of about this many characters
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+ESCAPE = re.compile(r'[\x00-\x1f\\"]')
+ESCAPES = {'"': '\\"', "\\": "\\\\", "\n": "\\n", "\r": "\\r", "\t": "\\t"}
+for i in range(0x20):
+    ESCAPES.setdefault(chr(i), f"\\u{i:04x}")
+
+# marks the end of a container's items
+END = object()
+
+INFINITY = float("inf")
+
+
+class ObjectStream(object):
+    """Object whose members are produced by an iterable of (key, value) pairs,
+    so that it can be written out without building a dict first."""
+
+    def __init__(self, members: Iterable[tuple[str, Any]]) -> None:
+        self.members = members
+
+    def items(self) -> Iterable[tuple[str, Any]]:
+        return self.members
+
+
+CONTAINERS = (Mapping, Sequence, Iterator, ObjectStream)
+
+
+def encode_string(s: str) -> str:
+    if ESCAPE.search(s) is None:
+        return '"' + s + '"'
+    return '"' + ESCAPE.sub(lambda m: ESCAPES[m.group()], s) + '"'
+
+
+def encode_scalar(val: Any) -> str | None:
+    # returns None for containers
+    if type(val) is str:
+        return encode_string(val)
+    if val is True:
+        return "true"
+    if val is False:
+        return "false"
+    if val is None:
+        return "null"
+    if type(val) is int:
+        return int.__repr__(val)
+    if type(val) is float:
+        if val != val:
+            raise ValueError(f"Out of range float values are not JSON: {val!r}")
+        # the parser reads numbers too large for a float (such as 1e400) as
+        # inf, so inf is written as a number that reads back as inf
+        if val == INFINITY:
+            return "1e999"
+        if val == -INFINITY:
+            return "-1e999"
+        return float.__repr__(val)
+    if isinstance(val, CONTAINERS) and not isinstance(val, (bytes, str)):
+        return
+    if isinstance(val, str):
+        return encode_string(val)
+    if isinstance(val, int):
+        return int.__repr__(val)
+    if isinstance(val, float):
+        return encode_scalar(float(val))
+
+    raise TypeError(f"Object of type {type(val).__name__} is not JSON serializable")
+
+
+def iter_encode(value: Any, indent: int | None = None) -> Iterator[str]:
+    """Encode 'value' as JSON text, yielded in pieces.
+
+    Dicts, other Mappings and ObjectStreams become objects, and lists, other
+    Sequences (such as the lazy, compact and columnar views) and iterators
+    (such as generators) become arrays. Iterators are consumed as they are
+    written, so they are never held in memory as a whole. With an
+    'indent' every member goes on its own line, indented by that many spaces
+    per level; without one the output has no whitespace at all. Nesting is
+    followed with an explicit stack, so any depth the parser accepts can be
+    written back out, and a container that contains itself raises a
+    ValueError.
+    """
+    key_sep = ":" if indent is None else ": "
+
+    # one [items, is_object, count, container] entry per open container
+    stack: list[list] = []
+    # ids of the open containers, to detect cycles
+    markers: set[int] = set()
+    prefix = ""
+    val = value
+
+    while True:
+        if val is not END:
+            scalar = encode_scalar(val)
+            if scalar is not None:
+                yield prefix + scalar
+            else:
+                if id(val) in markers:
+                    raise ValueError("Circular reference detected.")
+                markers.add(id(val))
+                if isinstance(val, (Mapping, ObjectStream)):
+                    stack.append([iter(val.items()), True, 0, val])
+                    yield prefix + "{"
+                else:
+                    stack.append([iter(val), False, 0, val])
+                    yield prefix + "["
+
+        if not stack:
+            return
+
+        frame = stack[-1]
+        items, is_object, count, container = frame
+        item = next(items, END)
+
+        if item is END:
+            stack.pop()
+            markers.discard(id(container))
+            close = "}" if is_object else "]"
+            if count and indent is not None:
+                close = "\n" + " " * (indent * len(stack)) + close
+            prefix = ""
+            val = END
+            yield close
+            continue
+
+        frame[2] = count + 1
+        prefix = "," if count else ""
+        if indent is not None:
+            prefix += "\n" + " " * (indent * len(stack))
+
+        if is_object:
+            key, val = item
+            if not isinstance(key, str):
+                raise TypeError(f"Keys must be str, not {type(key).__name__}: {key!r}")
+            prefix += encode_string(key) + key_sep
         else:
-            print(f'{" " * (depth + 1) * 4}{elem},')
-    print(" " * depth * 4, end="")
-    print("],")
+            val = item
+
+
+def dumps(value: Any, indent: int | None = None) -> str:
+    # the whole document built in a single buffer
+    return "".join(iter_encode(value, indent))
+
+
+def dump(
+    value: Any,
+    f: TextIO,
+    indent: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> None:
+    # pieces are joined and written once at least 'chunk_size' characters
+    # have built up, so 'f' sees a few large writes
+    parts = []
+    size = 0
+
+    for piece in iter_encode(value, indent):
+        parts.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            f.write("".join(parts))
+            parts.clear()
+            size = 0
+
+    f.write("".join(parts))
+
+
+def pprint_json(value: Any, f: TextIO | None = None, indent: int | None = 4) -> None:
+    f = f or sys.stdout
+    dump(value, f, indent)
+    f.write("\n")
+
+
+def pprint_dict(d: dict, depth: int = 0, f: TextIO | None = None) -> None:
+    # 'depth' is no longer needed, and only kept for existing callers
+    pprint_json(d, f)
+
+
+def pprint_list(
+    L: list, is_in_array: bool = False, depth: int = 0, f: TextIO | None = None
+) -> None:
+    # 'is_in_array' and 'depth' are no longer needed, and only kept for
+    # existing callers
+    pprint_json(L, f)
@@ -0,0 +1,250 @@
+import sys
+import time
+from typing import Any, Callable, Iterator
+
+# the parser methods that are timed, in the order they are reported when
+# they tie. 'iter_events' is timed per event pulled from it
+PROFILED_METHODS = (
+    "check_document",
+    "parse_object",
+    "parse_list",
+    "iter_events",
+    "skip_value",
+    "skip_whitespace",
+    "parse_key",
+    "parse_string",
+    "parse_number",
+    "parse_reserved_word",
+    "parse_comma",
+    "parse_colon",
+)
+
+METRIC_PREFIX = "json_parser"
+
+
+class MethodStats(object):
+    __slots__ = ("calls", "time_ns", "self_time_ns", "bytes", "max_depth", "blocks")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        # time spent in the method, with and without the profiled methods
+        # it called
+        self.time_ns = 0
+        self.self_time_ns = 0
+        # input consumed ('ptr' moved forward) while in the method
+        self.bytes = 0
+        # deepest nesting of open containers the method was called at
+        self.max_depth = 0
+        # memory blocks still allocated when the method returned
+        self.blocks = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "seconds": self.time_ns / 1e9,
+            "self_seconds": self.self_time_ns / 1e9,
+            "bytes": self.bytes,
+            "max_depth": self.max_depth,
+            "allocated_blocks": self.blocks,
+        }
+
+
+class ParseProfile(object):
+    """Per-method call counts, time, input consumed, nesting depth and
+    allocations for the parsers it is attached to.
+
+    Pass one as the 'profile' argument of a parser to profile every parse
+    the parser runs (one profile may be shared between parsers). The
+    profiled methods are wrapped on that parser instance only, so parsers
+    created without a profile run exactly the same code as before.
+    """
+
+    def __init__(self) -> None:
+        self.methods: dict[str, MethodStats] = {
+            name: MethodStats() for name in PROFILED_METHODS
+        }
+        # nesting of open containers in the value being parsed
+        self.depth = 0
+        self.max_depth = 0
+        # time spent in profiled callees, one entry per profiled call in
+        # progress, so that it can be taken off the caller's self time
+        self.frames: list[int] = []
+
+    def attach(self, jp: Any) -> None:
+        for name in PROFILED_METHODS:
+            method = getattr(jp, name)
+            if name == "iter_events":
+                wrapper = self.wrap_events(jp, method)
+            else:
+                wrapper = self.wrap(jp, method, self.methods[name])
+            # instance attributes take precedence over the class methods
+            # for every 'self.parse_*()' call the parser makes
+            setattr(jp, name, wrapper)
+
+    def record(
+        self,
+        stats: MethodStats,
+        entered: int,
+        start: int,
+        ptr: int,
+        blocks: int,
+        jp: Any,
+    ) -> None:
+        elapsed = time.perf_counter_ns() - start
+        stats.blocks += sys.getallocatedblocks() - blocks
+        stats.bytes += jp.ptr - ptr
+        stats.time_ns += elapsed
+        stats.self_time_ns += elapsed - self.frames.pop()
+        # the caller is charged for the time spent profiling this call as
+        # well, so that it is not counted as the caller's own time
+        if self.frames:
+            self.frames[-1] += time.perf_counter_ns() - entered
+
+    def wrap(self, jp: Any, method: Callable, stats: MethodStats) -> Callable:
+        def profiled(*args, **kwargs):
+            entered = time.perf_counter_ns()
+            stats.calls += 1
+            if self.depth > stats.max_depth:
+                stats.max_depth = self.depth
+            self.frames.append(0)
+            ptr = jp.ptr
+            blocks = sys.getallocatedblocks()
+            start = time.perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.record(stats, entered, start, ptr, blocks, jp)
+
+        return profiled
+
+    def wrap_events(self, jp: Any, method: Callable) -> Callable:
+        # the event stream is generated lazily, so the time and input are
+        # recorded for each event as it is pulled, and the depth is followed
+        # from the start and end events
+        stats = self.methods["iter_events"]
+
+        def profiled(*args) -> Iterator:
+            stats.calls += 1
+            events = method(*args)
+            base = self.depth
+            try:
+                while True:
+                    entered = time.perf_counter_ns()
+                    self.frames.append(0)
+                    ptr = jp.ptr
+                    blocks = sys.getallocatedblocks()
+                    start = time.perf_counter_ns()
+                    try:
+                        item = next(events, None)
+                    finally:
+                        self.record(stats, entered, start, ptr, blocks, jp)
+                    if item is None:
+                        return
+
+                    name = item[0].value
+                    if name == "start_object" or name == "start_array":
+                        self.depth += 1
+                        if self.depth > self.max_depth:
+                            self.max_depth = self.depth
+                        if self.depth > stats.max_depth:
+                            stats.max_depth = self.depth
+                    elif name == "end_object" or name == "end_array":
+                        self.depth -= 1
+                    yield item
+            finally:
+                # an abandoned or failed stream leaves its containers open
+                self.depth = base
+
+        return profiled
+
+    def as_dict(self) -> dict:
+        return {
+            "max_depth": self.max_depth,
+            "methods": {name: stats.as_dict() for name, stats in self.methods.items()},
+        }
+
+    def to_prometheus(self, prefix: str = METRIC_PREFIX) -> str:
+        # text exposition format: one counter family per statistic, with a
+        # 'method' label for each profiled method
+        families = [
+            ("calls_total", "counter", "Calls to each parser method.", "calls"),
+            (
+                "seconds_total",
+                "counter",
+                "Time spent in each parser method.",
+                "seconds",
+            ),
+            (
+                "self_seconds_total",
+                "counter",
+                "Time spent in each parser method, excluding profiled callees.",
+                "self_seconds",
+            ),
+            (
+                "bytes_total",
+                "counter",
+                "Input consumed by each parser method.",
+                "bytes",
+            ),
+            (
+                "allocated_blocks_total",
+                "counter",
+                "Memory blocks left allocated by each parser method.",
+                "allocated_blocks",
+            ),
+            (
+                "method_max_depth",
+                "gauge",
+                "Deepest nesting each parser method was called at.",
+                "max_depth",
+            ),
+        ]
+        methods = self.as_dict()["methods"]
+        lines = []
+
+        for suffix, kind, help_text, field in families:
+            name = f"{prefix}_{suffix}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for method, stats in methods.items():
+                lines.append(f'{name}{{method="{method}"}} {stats[field]}')
+
+        name = f"{prefix}_max_depth"
+        lines.append(f"# HELP {name} Deepest nesting of containers parsed.")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {self.max_depth}")
+
+        return "\n".join(lines) + "\n"
+
+    def format_report(self) -> str:
+        # the hot path: methods that were called, by the time spent in the
+        # method itself, most first
+        total = sum(stats.self_time_ns for stats in self.methods.values()) or 1
+        header = (
+            f'{"method":<22}{"calls":>10}{"self ms":>10}{"self %":>8}'
+            f'{"total ms":>10}{"bytes":>12}{"depth":>7}{"blocks":>9}'
+        )
+        lines = [header, "-" * len(header)]
+        ranked = sorted(
+            (item for item in self.methods.items() if item[1].calls),
+            key=lambda item: item[1].self_time_ns,
+            reverse=True,
+        )
+
+        for name, stats in ranked:
+            lines.append(
+                f"{name:<22}{stats.calls:>10}{stats.self_time_ns / 1e6:>10.2f}"
+                f"{stats.self_time_ns * 100 / total:>8.1f}"
+                f"{stats.time_ns / 1e6:>10.2f}{stats.bytes:>12}"
+                f"{stats.max_depth:>7}{stats.blocks:>9}"
+            )
+        lines.append(f"max depth: {self.max_depth}")
+
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        for stats in self.methods.values():
+            stats.__init__()
+        self.depth = 0
+        self.max_depth = 0
+        self.frames.clear()
@@ -0,0 +1,76 @@
+import re
+from enum import Enum
+from typing import Any, Iterator
+from src.errors import JsonPathError
+
+
+class Wildcard(Enum):
+    ANY = "*"
+
+
+WILDCARD = Wildcard.ANY
+
+# one step of a path: .key, .*, [0], [*], ["key"] or ['key']
+PATH_STEP = re.compile(r"""\.(\*|[^.\[\]]+)|\[(\*|\d+|"[^"]*"|'[^']*')\]""")
+
+Path = tuple[str | int | Wildcard, ...]
+
+
+def compile_path(expr: str) -> Path:
+    # turn an expression such as '$.items[*].price' into its steps,
+    # e.g. ("items", WILDCARD, "price")
+    if not expr.startswith("$"):
+        raise JsonPathError(f'Path must start with "$": {expr}')
+
+    steps = []
+    pos = 1
+    while pos < len(expr):
+        match = PATH_STEP.match(expr, pos)
+        if match is None:
+            raise JsonPathError(f"Invalid path expression: {expr}")
+        pos = match.end()
+
+        step = match.group(1) or match.group(2)
+        if step == "*":
+            steps.append(WILDCARD)
+        elif step[0] in "\"'" and match.group(2) is not None:
+            steps.append(step[1:-1])
+        elif step.isdigit() and match.group(2) is not None:
+            steps.append(int(step))
+        else:
+            steps.append(step)
+
+    return tuple(steps)
+
+
+def step_matches(step: str | int | Wildcard, key: str | int) -> bool:
+    # keys only select object members and indexes only select array elements
+    return step is WILDCARD or (step == key and type(step) is type(key))
+
+
+def select_path(value: Any, path: Path) -> Iterator[Any]:
+    # yield the parts of an already built value that 'path' selects
+    if not path:
+        yield value
+        return
+
+    step, rest = path[0], path[1:]
+    if isinstance(value, dict):
+        if step is WILDCARD:
+            children = list(value.values())
+        elif type(step) is str and step in value:
+            children = [value[step]]
+        else:
+            return
+    elif isinstance(value, list):
+        if step is WILDCARD:
+            children = value
+        elif type(step) is int and step < len(value):
+            children = [value[step]]
+        else:
+            return
+    else:
+        return
+
+    for child in children:
+        yield from select_path(child, rest)
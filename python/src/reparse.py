@@ -0,0 +1,242 @@
+from bisect import bisect_left
+from typing import Any, Callable
+from src.errors import JsonParseError
+
+
+class SpanNode(object):
+    # one container's length, value and children, at offsets from its bracket
+    __slots__ = ("length", "value", "starts", "keys", "children")
+
+    def __init__(self, value: dict | list) -> None:
+        self.length = 0
+        self.value = value
+        self.starts: list[int] = []
+        self.keys: list[Any] = []
+        self.children: list[SpanNode] = []
+
+    def add_child(self, start: int, key: Any, node: "SpanNode") -> None:
+        self.starts.append(start)
+        self.keys.append(key)
+        self.children.append(node)
+
+
+class SpanIndex(object):
+    def __init__(self, text: Any, start: int, root: SpanNode) -> None:
+        # the span tree of 'text', whose root object opens at 'start'
+        self.text = text
+        self.start = start
+        self.root = root
+
+
+# finds a container that can be reused, unparsed, at an offset in the text
+Reuse = Callable[[int], "SpanNode | None"]
+
+
+def index_container(jp: Any, reuse: Reuse | None = None) -> SpanNode:
+    # parse the container at the cursor, taking children from 'reuse' if it has them
+    buf = jp.buf
+    max_depth = jp.max_depth
+    open_object = jp.OPEN_OBJECT
+    open_array = jp.OPEN_ARRAY
+    close_object = jp.CLOSE_OBJECT
+    close_array = jp.CLOSE_ARRAY
+    quote = jp.QUOTE
+
+    # each open container's node and the offset of its opening bracket
+    stack: list[tuple[SpanNode, int]] = []
+    key: Any = None
+
+    while True:
+        # at the start of a value, found under 'key' in its container
+        start = jp.ptr
+        char = buf[start]
+        node = None
+        if reuse is not None and len(stack) == 1:
+            node = reuse(start)
+
+        if node is None and (char == open_object or char == open_array):
+            if len(stack) >= max_depth:
+                raise jp.error(
+                    f"Maximum nesting depth of {max_depth} exceeded: invalid entry."
+                )
+            node = SpanNode({} if char == open_object else [])
+            if stack:
+                parent, parent_start = stack[-1]
+                if type(parent.value) is dict:
+                    parent.value[key] = node.value
+                else:
+                    parent.value.append(node.value)
+                parent.add_child(start - parent_start, key, node)
+            stack.append((node, start))
+            jp.ptr += 1
+            jp.skip_whitespace()
+        else:
+            if node is not None:
+                item = node.value
+                jp.ptr = start + node.length
+            elif char == quote:
+                item = jp.parse_string()
+            else:
+                item = jp.parse_number()
+            if item is None:
+                item = jp.parse_reserved_word()
+            if item is None:
+                raise jp.error("Value unable to be parsed: invalid entry.")
+
+            parent, parent_start = stack[-1]
+            if type(parent.value) is dict:
+                parent.value[key] = item
+            else:
+                parent.value.append(item)
+            if node is not None:
+                parent.add_child(start - parent_start, key, node)
+            jp.skip_whitespace()
+            jp.parse_comma()
+
+        # close every container that ends here, then stop at the start of
+        # the next value
+        while True:
+            node, start = stack[-1]
+            if type(node.value) is dict:
+                if buf[jp.ptr] != close_object:
+                    key = jp.parse_key()
+                    jp.skip_whitespace()
+                    jp.parse_colon()
+                    break
+            elif buf[jp.ptr] != close_array:
+                key = len(node.value)
+                break
+
+            # step past the closing bracket
+            jp.ptr += 1
+            node.length = jp.ptr - start
+            stack.pop()
+            if not stack:
+                return node
+            jp.skip_whitespace()
+            jp.parse_comma()
+
+
+def index_document(jp: Any) -> SpanIndex:
+    # parse the whole input of 'jp' with the span of every container
+    jp.check_document()
+    start = jp.ptr
+    return SpanIndex(jp.buf, start, index_container(jp))
+
+
+def find_enclosing(
+    index: SpanIndex, begin: int, end: int
+) -> list[tuple[SpanNode, int, int]]:
+    # the containers whose inside (between their brackets) holds all of
+    # [begin, end), from the root down, each with the offset of its opening
+    # bracket and its position among its parent's children
+    path: list[tuple[SpanNode, int, int]] = []
+    node, start, slot = index.root, index.start, -1
+
+    while start < begin and end < start + node.length:
+        path.append((node, start, slot))
+        # the last child that opens before the edit is the only one that
+        # may hold it
+        slot = bisect_left(node.starts, begin - start) - 1
+        if slot < 0:
+            break
+        start += node.starts[slot]
+        node = node.children[slot]
+
+    return path
+
+
+def reparse_container(
+    jp: Any, node: SpanNode, start: int, depth: int, edit: tuple[int, int, int]
+) -> SpanNode | None:
+    # parse the container at 'start' again, or None if the edit moved its end
+    begin, deleted, inserted = edit
+    delta = inserted - deleted
+    slots = {offset: slot for slot, offset in enumerate(node.starts)}
+
+    def reuse(ptr: int) -> SpanNode | None:
+        if ptr < begin:
+            offset = ptr - start
+        elif ptr >= begin + inserted:
+            offset = ptr - delta - start
+        else:
+            return None
+        slot = slots.get(offset)
+        if slot is None:
+            return None
+        child = node.children[slot]
+        # a child before the edit must end before it; one after it always
+        # starts after the deleted text
+        if ptr < begin and ptr + child.length > begin:
+            return None
+        return child
+
+    max_depth = jp.max_depth
+    jp.max_depth = max_depth - depth
+    jp.ptr = start
+    try:
+        res = index_container(jp, reuse)
+    except (JsonParseError, IndexError, ValueError):
+        return None
+    finally:
+        jp.max_depth = max_depth
+
+    if jp.ptr != start + node.length + delta:
+        return None
+    return res
+
+
+def replace_child(node: SpanNode, slot: int, child: SpanNode, delta: int) -> SpanNode:
+    # a copy of 'node' with the child in 'slot' changed to 'child', which is
+    # 'delta' characters longer than the one it replaces
+    old = node.children[slot]
+    res = SpanNode(node.value.copy())
+    res.length = node.length + delta
+    res.keys = node.keys
+    res.children = node.children.copy()
+    res.children[slot] = child
+
+    res.starts = node.starts
+    if delta:
+        starts = node.starts
+        res.starts = starts[: slot + 1] + [s + delta for s in starts[slot + 1 :]]
+
+    # a key given more than once holds only its last value, which may not
+    # be the child being replaced
+    key = node.keys[slot]
+    if node.value[key] is old.value:
+        res.value[key] = child.value
+
+    return res
+
+
+def reparse_edit(
+    jp: Any, index: SpanIndex, offset: int, deleted: int, inserted: Any
+) -> SpanIndex:
+    # the index of the edited text, parsing only the containers around the edit
+    text = index.text
+    end = offset + deleted
+    if offset < 0 or deleted < 0 or end > len(text):
+        raise ValueError(
+            f"Edit of {deleted} at offset {offset} is outside the document."
+        )
+
+    jp.s = text[:offset] + inserted + text[end:]
+    edit = (offset, deleted, len(inserted))
+    delta = len(inserted) - deleted
+    path = find_enclosing(index, offset, end)
+
+    for depth in range(len(path) - 1, -1, -1):
+        node, start, slot = path[depth]
+        res = reparse_container(jp, node, start, depth, edit)
+        if res is None:
+            continue
+
+        # swap the new container into each one around it
+        for parent, _, parent_slot in reversed(path[:depth]):
+            res = replace_child(parent, slot, res, delta)
+            slot = parent_slot
+        return SpanIndex(jp.buf, index.start, res)
+
+    jp.reset_ptr()
+    return index_document(jp)
@@ -0,0 +1,329 @@
+import dataclasses
+import types
+import typing
+from typing import Any, Callable
+from src.errors import JsonSchemaError
+
+# decodes the value at the cursor of a parser, given the number of
+# containers that are open around it
+Decoder = Callable[[Any, int], Any]
+
+# a field with no value yet
+MISSING = object()
+
+
+class SchemaMismatch(Exception):
+    # the document is not of the schema's shape (or is not valid JSON); the
+    # caller falls back to the generic parse
+    pass
+
+
+def decode_str(jp: Any, depth: int) -> str:
+    val = jp.parse_string()
+    if val is None:
+        raise SchemaMismatch
+    return val
+
+
+def parse_number(jp: Any) -> int | float | None:
+    # a lexeme the parser accepts but 'float' doesn't (such as "1e") is a
+    # mismatch here, so that a ValueError only ever comes from the values
+    # being built
+    try:
+        return jp.parse_number()
+    except ValueError:
+        raise SchemaMismatch from None
+
+
+def decode_int(jp: Any, depth: int) -> int:
+    val = parse_number(jp)
+    if type(val) is not int:
+        raise SchemaMismatch
+    return val
+
+
+def decode_float(jp: Any, depth: int) -> float:
+    val = parse_number(jp)
+    if val is None:
+        raise SchemaMismatch
+    return float(val)
+
+
+def decode_bool(jp: Any, depth: int) -> bool:
+    val = jp.parse_reserved_word()
+    if type(val) is not bool:
+        raise SchemaMismatch
+    return val
+
+
+def generic_decoder(open_attr: str | None) -> Decoder:
+    # any value, or any container opened by the parser's 'open_attr' token,
+    # built by the generic parser. its depth limit is lowered by the depth
+    # the value is found at, so the limit still applies to the document
+    def decode(jp: Any, depth: int) -> Any:
+        if open_attr is not None and jp.buf[jp.ptr] != getattr(jp, open_attr):
+            raise SchemaMismatch
+
+        max_depth = jp.max_depth
+        jp.max_depth = max_depth - depth
+        try:
+            return jp.build()
+        except ValueError:
+            raise SchemaMismatch from None
+        finally:
+            jp.max_depth = max_depth
+
+    return decode
+
+
+def optional_decoder(decode_value: Decoder) -> Decoder:
+    # 'null' decodes to None here, where the generic parser returns "null"
+    def decode(jp: Any, depth: int) -> Any:
+        ptr = jp.ptr
+        word = jp.buf[ptr : ptr + 4]
+        if word == "null" or word == b"null":
+            jp.ptr = ptr + 4
+            return None
+        return decode_value(jp, depth)
+
+    return decode
+
+
+def list_decoder(decode_item: Decoder) -> Decoder:
+    def decode(jp: Any, depth: int) -> list:
+        buf = jp.buf
+        if buf[jp.ptr] != jp.OPEN_ARRAY or depth >= jp.max_depth:
+            raise SchemaMismatch
+
+        close_array = jp.CLOSE_ARRAY
+        res = []
+        jp.ptr += 1
+        jp.skip_whitespace()
+        while buf[jp.ptr] != close_array:
+            res.append(decode_item(jp, depth + 1))
+            jp.skip_whitespace()
+            jp.parse_comma()
+        jp.ptr += 1
+
+        return res
+
+    return decode
+
+
+def map_decoder(decode_value: Decoder) -> Decoder:
+    # an object with any keys, all holding values of one type
+    def decode(jp: Any, depth: int) -> dict:
+        buf = jp.buf
+        if buf[jp.ptr] != jp.OPEN_OBJECT or depth >= jp.max_depth:
+            raise SchemaMismatch
+
+        close_object = jp.CLOSE_OBJECT
+        res = {}
+        jp.ptr += 1
+        jp.skip_whitespace()
+        while buf[jp.ptr] != close_object:
+            key = jp.parse_key()
+            jp.skip_whitespace()
+            jp.parse_colon()
+            res[key] = decode_value(jp, depth + 1)
+            jp.skip_whitespace()
+            jp.parse_comma()
+        jp.ptr += 1
+
+        return res
+
+    return decode
+
+
+class ObjectDecoder(object):
+    """Decodes objects with a fixed set of keys straight into the values
+    they are made into: instances of a dataclass, or dicts for a schema
+    given as a dict of key types.
+
+    Keys are expected in the order the fields are declared in, so each one
+    is matched by comparing the input against the quoted field name rather
+    than parsing it; a key out of order is parsed and looked up instead.
+    Field values are decoded by the decoder for their type and put
+    straight into place for the constructor.
+    """
+
+    def __init__(self, make: Callable[[list], Any]) -> None:
+        # builds the value from the field values, in field order
+        self.make = make
+        self.names: list[str] = []
+        self.tokens: list[str] = []
+        self.byte_tokens: list[bytes] = []
+        self.decoders: list[Decoder] = []
+        self.defaults: list[Any] = []
+        self.index: dict[str, int] = {}
+
+    def add_field(self, name: str, decode: Decoder, default: Any = MISSING) -> None:
+        # 'default' is MISSING for a required field, and a 'default_factory'
+        # is wrapped in a dataclasses.Field so it is called for each value
+        self.index[name] = len(self.names)
+        self.names.append(name)
+        self.tokens.append(f'"{name}"')
+        self.byte_tokens.append(f'"{name}"'.encode())
+        self.decoders.append(decode)
+        self.defaults.append(default)
+
+    def decode(self, jp: Any, depth: int) -> Any:
+        buf = jp.buf
+        if buf[jp.ptr] != jp.OPEN_OBJECT or depth >= jp.max_depth:
+            raise SchemaMismatch
+
+        close_object = jp.CLOSE_OBJECT
+        tokens = self.tokens if isinstance(buf, str) else self.byte_tokens
+        decoders = self.decoders
+        n = len(tokens)
+        values = [MISSING] * n
+        # the field whose key is expected next
+        i = 0
+
+        jp.ptr += 1
+        jp.skip_whitespace()
+        while buf[jp.ptr] != close_object:
+            ptr = jp.ptr
+            if i < n and buf[ptr : ptr + len(tokens[i])] == tokens[i]:
+                jp.ptr = ptr + len(tokens[i])
+            else:
+                i = self.index.get(jp.parse_key(), -1)
+                if i < 0:
+                    raise SchemaMismatch
+            jp.skip_whitespace()
+            jp.parse_colon()
+            values[i] = decoders[i](jp, depth + 1)
+            i += 1
+            jp.skip_whitespace()
+            jp.parse_comma()
+        jp.ptr += 1
+
+        for i, val in enumerate(values):
+            if val is MISSING:
+                default = self.defaults[i]
+                if default is MISSING:
+                    raise SchemaMismatch
+                if isinstance(default, dataclasses.Field):
+                    default = default.default_factory()
+                values[i] = default
+
+        return self.make(values)
+
+
+def compile_type(tp: Any, memo: dict) -> Decoder:
+    # the decoder for values of type 'tp'. 'memo' holds the decoders of the
+    # dataclasses compiled so far, so that a dataclass may contain itself
+    if tp is str:
+        return decode_str
+    if tp is bool:
+        return decode_bool
+    if tp is int:
+        return decode_int
+    if tp is float:
+        return decode_float
+    if tp is Any or tp is object:
+        return generic_decoder(None)
+    if tp is dict:
+        return generic_decoder("OPEN_OBJECT")
+    if tp is list:
+        return generic_decoder("OPEN_ARRAY")
+    if isinstance(tp, dict):
+        return compile_object(tp, memo)
+    if isinstance(tp, type) and dataclasses.is_dataclass(tp):
+        return compile_dataclass(tp, memo)
+
+    origin = typing.get_origin(tp)
+    args = typing.get_args(tp)
+    if origin is typing.Union or origin is types.UnionType:
+        others = [arg for arg in args if arg is not type(None)]
+        if len(others) == 1 and len(args) == 2:
+            return optional_decoder(compile_type(others[0], memo))
+    elif origin is list and len(args) == 1:
+        return list_decoder(compile_type(args[0], memo))
+    elif origin is dict and len(args) == 2 and args[0] is str:
+        return map_decoder(compile_type(args[1], memo))
+
+    raise JsonSchemaError(f"Unsupported schema type: {tp!r}")
+
+
+def compile_object(spec: dict, memo: dict) -> Decoder:
+    names = list(spec)
+    decoder = ObjectDecoder(lambda values: dict(zip(names, values)))
+    for name, tp in spec.items():
+        if not isinstance(name, str):
+            raise JsonSchemaError(f"Schema keys must be str: {name!r}")
+        decoder.add_field(name, compile_type(tp, memo))
+    return decoder.decode
+
+
+def compile_dataclass(cls: type, memo: dict) -> Decoder:
+    if cls in memo:
+        return memo[cls].decode
+
+    # fields are passed to the constructor by position, so no keyword dict
+    # is built for each instance, except for keyword-only fields
+    positional: list[int] = []
+    keywords: list[tuple[str, int]] = []
+
+    def make(values: list) -> Any:
+        if not keywords:
+            return cls(*values)
+        args = [values[i] for i in positional]
+        return cls(*args, **{name: values[i] for name, i in keywords})
+
+    decoder = ObjectDecoder(make)
+    memo[cls] = decoder
+    hints = typing.get_type_hints(cls)
+    for field in dataclasses.fields(cls):
+        if not field.init:
+            continue
+        if field.kw_only:
+            keywords.append((field.name, len(decoder.names)))
+        else:
+            positional.append(len(decoder.names))
+        default: Any = field.default
+        if field.default_factory is not dataclasses.MISSING:
+            default = field
+        elif default is dataclasses.MISSING:
+            default = MISSING
+        decoder.add_field(field.name, compile_type(hints[field.name], memo), default)
+
+    return decoder.decode
+
+
+class Schema(object):
+    """A compiled document shape, used by 'JsonParser.parse_schema'.
+
+    'spec' is either a dataclass, whose instances the documents are decoded
+    into, or a dict of the keys a document must have and their types, for
+    documents decoded into dicts. Types are str, int, float, bool, dict,
+    list, Any, X | None, list[X], dict[str, X], dataclasses and nested
+    dicts of key types. Documents with a missing or unexpected key or a
+    value of the wrong type don't match the schema.
+    """
+
+    def __init__(self, spec: type | dict) -> None:
+        if not isinstance(spec, dict) and not (
+            isinstance(spec, type) and dataclasses.is_dataclass(spec)
+        ):
+            raise JsonSchemaError(f"Schema must be a dataclass or a dict: {spec!r}")
+        self.spec = spec
+        self.decode: Decoder = compile_type(spec, {})
+
+
+# schemas compiled for dataclasses passed to 'compile_schema'
+SCHEMAS: dict[type, Schema] = {}
+
+
+def compile_schema(spec: "Schema | type | dict") -> Schema:
+    # dataclasses are compiled once; a dict spec is compiled on every call,
+    # so build a Schema from it once to reuse it
+    if isinstance(spec, Schema):
+        return spec
+    if isinstance(spec, dict):
+        return Schema(spec)
+
+    schema = SCHEMAS.get(spec)
+    if schema is None:
+        schema = SCHEMAS[spec] = Schema(spec)
+    return schema
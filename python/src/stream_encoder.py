@@ -0,0 +1,126 @@
+from typing import Any, BinaryIO, Iterable, Iterator, TextIO
+from src.pprint_objects import encode_scalar, encode_string, iter_encode
+
+# buffered output is written out once it reaches this many characters
+DEFAULT_FLUSH_SIZE = 64 * 1024
+
+
+def iter_encode_events(
+    events: Iterable[tuple[Any, Any]], indent: int | None = None
+) -> Iterator[str]:
+    # the inverse of 'JsonParser.iter_events': write the value described by
+    # a stream of (JsonEvent, value) pairs back out as text, holding nothing
+    # but a member count per open container
+    key_sep = ":" if indent is None else ": "
+    counts: list[int] = []
+    after_key = False
+
+    for event, val in events:
+        name = event.value
+
+        if name == "end_object" or name == "end_array":
+            count = counts.pop()
+            close = "}" if name == "end_object" else "]"
+            if count and indent is not None:
+                close = "\n" + " " * (indent * len(counts)) + close
+            yield close
+            if not counts:
+                return
+            continue
+
+        prefix = ""
+        if counts and not after_key:
+            prefix = "," if counts[-1] else ""
+            if indent is not None:
+                prefix += "\n" + " " * (indent * len(counts))
+            counts[-1] += 1
+
+        if name == "key":
+            after_key = True
+            yield prefix + encode_string(val) + key_sep
+            continue
+        after_key = False
+
+        if name == "value":
+            yield prefix + encode_scalar(val)
+            if not counts:
+                return
+        else:
+            counts.append(0)
+            yield prefix + ("{" if name == "start_object" else "[")
+
+
+class StreamEncoder(object):
+    """Writes JSON to a file or socket as it is produced.
+
+    Values passed to 'encode' may contain generators and other iterators
+    (written as arrays) and ObjectStreams (written as objects), which are
+    consumed as they are written. Output is buffered and handed to the
+    target once 'flush_size' characters have built up, so memory stays
+    bounded by the flush size plus the largest single string, however large
+    the document. With an 'encoding' (always the case for a socket) the
+    output is written as bytes.
+    """
+
+    def __init__(
+        self,
+        f: TextIO | BinaryIO | Any,
+        indent: int | None = None,
+        flush_size: int = DEFAULT_FLUSH_SIZE,
+        encoding: str | None = None,
+    ) -> None:
+        # sockets have 'sendall' rather than 'write'
+        if hasattr(f, "write"):
+            self.write_out = f.write
+        else:
+            self.write_out = f.sendall
+            encoding = encoding or "utf-8"
+        self.indent = indent
+        self.flush_size = flush_size
+        self.encoding = encoding
+        self.parts: list[str] = []
+        self.size = 0
+        # characters handed to the target so far
+        self.written = 0
+
+    def write(self, piece: str) -> None:
+        self.parts.append(piece)
+        self.size += len(piece)
+        if self.size >= self.flush_size:
+            self.flush()
+
+    def encode(self, value: Any) -> None:
+        for piece in iter_encode(value, self.indent):
+            self.write(piece)
+
+    def encode_events(self, events: Iterable[tuple[Any, Any]]) -> None:
+        for piece in iter_encode_events(events, self.indent):
+            self.write(piece)
+
+    def flush(self) -> None:
+        if not self.parts:
+            return
+
+        out = "".join(self.parts)
+        self.parts.clear()
+        self.size = 0
+        self.written += len(out)
+        self.write_out(out.encode(self.encoding) if self.encoding else out)
+
+    def __enter__(self) -> "StreamEncoder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.flush()
+
+
+def stream_dump(
+    value: Any,
+    f: TextIO | BinaryIO | Any,
+    indent: int | None = None,
+    flush_size: int = DEFAULT_FLUSH_SIZE,
+    encoding: str | None = None,
+) -> None:
+    # pass an 'encoding' to write to a binary file
+    with StreamEncoder(f, indent, flush_size, encoding) as encoder:
+        encoder.encode(value)
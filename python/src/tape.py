@@ -0,0 +1,212 @@
+import re
+from array import array
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# stage 1 works through the input in blocks of this many bytes, so its
+# scratch arrays stay small however large the input is
+BLOCK_SIZE = 1024 * 1024
+
+QUOTE = ord('"')
+COLON = ord(":")
+COMMA = ord(",")
+STRUCTURAL_CHARS = b"{}[]:,"
+
+# pure-Python stage 1: whole strings, structural characters, and the quote
+# that opens a string with no closing quote
+TAPE_TOKENS = re.compile(rb'"[^"]*"|[{}\[\]:,]|"')
+
+if np is not None:
+    IS_STRUCTURAL = np.zeros(256, dtype=bool)
+    IS_STRUCTURAL[list(STRUCTURAL_CHARS)] = True
+
+
+def build_tape_numpy(buf: Any) -> array:
+    # strings have no escapes, so a character is inside a string exactly
+    # when an odd number of quotes come before it (counting its own quote
+    # for the one that opens the string). the running count only needs its
+    # lowest bit, so it is kept in uint8 and allowed to wrap
+    data = np.frombuffer(buf, dtype=np.uint8)
+    tape = array("q")
+    parity = 0
+
+    for start in range(0, len(data), BLOCK_SIZE):
+        block = data[start : start + BLOCK_SIZE]
+        quotes = block == QUOTE
+        inside = (np.cumsum(quotes, dtype=np.uint8) + parity) & 1
+        marks = quotes | (IS_STRUCTURAL[block] & (inside == 0))
+        positions = np.flatnonzero(marks).astype(np.int64) + start
+        tape.frombytes(positions.tobytes())
+        parity = int(inside[-1])
+
+    return tape
+
+
+def build_tape_python(buf: Any) -> array:
+    tape = array("q")
+
+    for match in TAPE_TOKENS.finditer(buf):
+        start = match.start()
+        tape.append(start)
+        end = match.end()
+        if end - start > 1:
+            # a string: the closing quote too
+            tape.append(end - 1)
+        elif buf[start] == QUOTE:
+            # nothing after a string that is never closed is structural
+            break
+
+    return tape
+
+
+def build_tape(buf: Any) -> array:
+    """Stage 1: the offsets of every structural character ('{}[]:,') that is
+    not inside a string, and of the opening and closing quote of every
+    string, in order.
+
+    Uses NumPy to scan whole blocks of the input at once when it is
+    installed, and a regex scan otherwise; both give the same tape.
+    """
+    if np is not None:
+        return build_tape_numpy(buf)
+    return build_tape_python(buf)
+
+
+def walk_tape(jp, tape: array) -> Any:
+    # stage 2: build the value at 'jp.ptr' following the same rules as
+    # 'JsonParser.iter_events', but reading strings and structural
+    # characters off the tape. only scalars between tape entries (numbers
+    # and reserved words) are read from the buffer by the parser itself.
+    # every time a structural character or quote is consumed the tape index
+    # 'i' moves on, so 'tape[i]' is always the next one after 'ptr'
+    buf = jp.buf
+    n_tape = len(tape)
+    n_buf = len(buf)
+    max_depth = jp.max_depth
+    whitespace = jp.WHITESPACE
+    open_object = jp.OPEN_OBJECT
+    open_array = jp.OPEN_ARRAY
+    close_object = jp.CLOSE_OBJECT
+    close_array = jp.CLOSE_ARRAY
+    key_cache = jp.key_cache
+
+    # start from the first tape entry at or after the cursor
+    ptr = jp.ptr
+    lo, hi = 0, n_tape
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if tape[mid] < ptr:
+            lo = mid + 1
+        else:
+            hi = mid
+    i = lo
+
+    # open containers, and the key each open object is waiting to fill
+    stack: list = []
+    keys: list = []
+    root = None
+
+    while True:
+        char = buf[ptr]
+
+        if char == open_object or char == open_array:
+            if len(stack) >= max_depth:
+                raise jp.error(
+                    f"Maximum nesting depth of {max_depth} exceeded: invalid entry.",
+                    ptr,
+                )
+            val: Any = {} if char == open_object else []
+            ptr += 1
+            i += 1
+        elif char == QUOTE:
+            if i + 1 >= n_tape:
+                raise jp.error("String is missing close quote.", ptr)
+            end = tape[i + 1]
+            val = str(buf[ptr + 1 : end], "utf-8")
+            ptr = end + 1
+            i += 2
+        else:
+            jp.ptr = ptr
+            val = jp.parse_number()
+            if val is None:
+                val = jp.parse_reserved_word()
+            if val is None:
+                raise jp.error("Value unable to be parsed: invalid entry.", ptr)
+            ptr = jp.ptr
+
+        if not stack:
+            root = val
+        elif type(stack[-1]) is dict:
+            stack[-1][keys[-1]] = val
+        else:
+            stack[-1].append(val)
+
+        if type(val) is dict or type(val) is list:
+            stack.append(val)
+            keys.append(None)
+            while ptr < n_buf and buf[ptr] in whitespace:
+                ptr += 1
+        elif not stack:
+            jp.ptr = ptr
+            return root
+        else:
+            while ptr < n_buf and buf[ptr] in whitespace:
+                ptr += 1
+            if buf[ptr] == COMMA:
+                comma = ptr
+                ptr += 1
+                i += 1
+                while ptr < n_buf and buf[ptr] in whitespace:
+                    ptr += 1
+                if buf[ptr] == close_object:
+                    raise jp.error("Trailing commas are not allowed.", comma)
+
+        # close every container that ends here, then stop at the start of
+        # the next value
+        while True:
+            if type(stack[-1]) is dict:
+                if buf[ptr] != close_object:
+                    if buf[ptr] != QUOTE:
+                        raise jp.error("Keys must be valid strings.", ptr)
+                    if i + 1 >= n_tape:
+                        raise jp.error("String is missing close quote.", ptr)
+                    end = tape[i + 1]
+                    key = str(buf[ptr + 1 : end], "utf-8")
+                    if key_cache is not None:
+                        key = key_cache.intern(key)
+                    keys[-1] = key
+                    ptr = end + 1
+                    i += 2
+                    while ptr < n_buf and buf[ptr] in whitespace:
+                        ptr += 1
+                    if buf[ptr] == COLON:
+                        ptr += 1
+                        i += 1
+                        while ptr < n_buf and buf[ptr] in whitespace:
+                            ptr += 1
+                    break
+            elif buf[ptr] != close_array:
+                break
+
+            # step past the closing bracket
+            ptr += 1
+            i += 1
+            stack.pop()
+            keys.pop()
+            if not stack:
+                jp.ptr = ptr
+                return root
+            while ptr < n_buf and buf[ptr] in whitespace:
+                ptr += 1
+            if buf[ptr] == COMMA:
+                comma = ptr
+                ptr += 1
+                i += 1
+                while ptr < n_buf and buf[ptr] in whitespace:
+                    ptr += 1
+                if buf[ptr] == close_object:
+                    raise jp.error("Trailing commas are not allowed.", comma)
@@ -0,0 +1,150 @@
+import re
+from typing import Any
+
+WS = r"[ \t\n\r]*"
+
+# a number the parser accepts and can convert: the lexemes of its NUMBER
+# pattern that 'float' also accepts, followed by a number terminator or the
+# end of the input
+NUMBER = r"(?:\d+(?:\.\d*|e-?\d+)?|-(?:\d+(?:\.\d*|e\d+)?|\.\d+))(?=[ \t\n\r},\]]|\Z)"
+
+# longer string values are left to the token-at-a-time path, which finds
+# their closing quote with 'find' faster than a regex can scan for it
+MAX_FAST_STRING = 256
+
+SCALAR = rf'(?:"[^"]{{0,{MAX_FAST_STRING}}}"|{NUMBER}|true|false|null)'
+
+# the comma after a value and its whitespace: either a comma that is not
+# followed by "}" (a trailing comma), or no comma at all. both lookaheads
+# also reject whitespace, so a failed match can't back off into it
+COMMA = rf"(?:,{WS}(?![ \t\n\r}}])|(?![ \t\n\r,]))"
+
+# an array element that is a scalar, with the whitespace and comma after it
+ELEMENT = SCALAR + WS + COMMA
+
+# an object key and colon, and (in group 1) its value, whitespace and comma
+# when the value is a scalar
+MEMBER = rf'"[^"]*"{WS}(?::{WS})?({SCALAR}{WS}{COMMA})?'
+
+ELEMENTS = {str: re.compile(ELEMENT), bytes: re.compile(ELEMENT.encode())}
+MEMBERS = {str: re.compile(MEMBER), bytes: re.compile(MEMBER.encode())}
+NUMBERS = {str: re.compile(NUMBER), bytes: re.compile(NUMBER.encode())}
+RESERVED_WORDS = {str: ("true", "false", "null"), bytes: (b"true", b"false", b"null")}
+
+
+def validate_value(jp: Any) -> int:
+    # check the value at the cursor without building it and return the offset
+    # past it. runs of scalars are matched by one regex, the rest a token at a
+    # time. unlike the parser, truncated input and numbers like "1e" give a
+    # JsonParseError rather than an IndexError or ValueError
+    buf = jp.buf
+    n = len(buf)
+    kind = str if isinstance(buf, str) else bytes
+    match_member = MEMBERS[kind].match
+    match_element = ELEMENTS[kind].match
+    match_number = NUMBERS[kind].match
+    reserved_words = RESERVED_WORDS[kind]
+    whitespace = jp.WHITESPACE
+    open_object = jp.OPEN_OBJECT
+    open_array = jp.OPEN_ARRAY
+    close_object = jp.CLOSE_OBJECT
+    close_array = jp.CLOSE_ARRAY
+    quote = jp.QUOTE
+    quote_token = '"' if kind is str else b'"'
+    max_depth = jp.max_depth
+
+    # True for each open object, False for each open array
+    stack: list[bool] = []
+    ptr = jp.ptr
+
+    try:
+        while True:
+            # at the start of a value
+            char = buf[ptr]
+
+            if char == open_object or char == open_array:
+                if len(stack) >= max_depth:
+                    message = f"Maximum nesting depth of {max_depth} exceeded"
+                    raise jp.error(message + ": invalid entry.", ptr)
+                stack.append(char == open_object)
+                ptr += 1
+                while ptr < n and buf[ptr] in whitespace:
+                    ptr += 1
+            else:
+                if char == quote:
+                    end = buf.find(quote_token, ptr + 1)
+                    if end == -1:
+                        raise jp.error("String is missing close quote.", ptr)
+                    ptr = end + 1
+                else:
+                    match = match_number(buf, ptr)
+                    if match is not None:
+                        ptr = match.end()
+                    else:
+                        for word in reserved_words:
+                            if buf[ptr : ptr + len(word)] == word:
+                                ptr += len(word)
+                                break
+                        else:
+                            raise jp.error(
+                                "Value unable to be parsed: invalid entry.", ptr
+                            )
+                if not stack:
+                    return ptr
+                ptr = skip_comma(jp, ptr)
+
+            # the members that follow, up to the next value that has to be
+            # checked a token at a time
+            while True:
+                char = buf[ptr]
+
+                if stack[-1]:
+                    if char != close_object:
+                        match = match_member(buf, ptr)
+                        if match is None:
+                            message = "String is missing close quote."
+                            if char != quote:
+                                message = "Keys must be valid strings."
+                            raise jp.error(message, ptr)
+                        ptr = match.end()
+                        if match.lastindex is None:
+                            break
+                        continue
+                elif char != close_array:
+                    match = match_element(buf, ptr)
+                    if match is None:
+                        break
+                    ptr = match.end()
+                    continue
+
+                # step past the closing bracket
+                ptr += 1
+                stack.pop()
+                if not stack:
+                    return ptr
+                ptr = skip_comma(jp, ptr)
+    except IndexError:
+        message = "Unexpected end of JSON input: invalid entry."
+        raise jp.error(message, n) from None
+
+
+def skip_comma(jp: Any, ptr: int) -> int:
+    # the whitespace and optional comma after a value, as 'skip_whitespace'
+    # and 'parse_comma' consume them
+    buf = jp.buf
+    n = len(buf)
+    whitespace = jp.WHITESPACE
+
+    while ptr < n and buf[ptr] in whitespace:
+        ptr += 1
+    if buf[ptr] != jp.COMMA:
+        return ptr
+
+    start = ptr
+    ptr += 1
+    while ptr < n and buf[ptr] in whitespace:
+        ptr += 1
+    if buf[ptr] == jp.CLOSE_OBJECT:
+        raise jp.error("Trailing commas are not allowed.", start)
+
+    return ptr
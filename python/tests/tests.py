@@ -1,14 +1,80 @@
+import asyncio
+import dataclasses
 import unittest
 from unittest import TestCase
 from parameterized.parameterized import parameterized
 import os
+import pickle
 from pathlib import Path
-from src.json_parser import JsonParser
-from src.errors import JsonParseError
+from typing import Any
+import tempfile
+from io import BytesIO, StringIO
+from src.bench import CORPORA, run_benchmarks
+from src.cache import KeyCache, ParseCache
+from src.columnar import ColumnarTable
+from src.compact import MIN_INDEXED_WIDTH, CompactArray, CompactObject
+from src.incremental_parser import IncrementalParser, iter_json_stream
+from src.ndjson import parse_ndjson, split_shards
+from src.json_parser import BytesJsonParser, JsonEvent, JsonParser, build_value
+from src.errors import JsonParseError, JsonPathError, JsonSchemaError
+from src.lazy import LazyArray, LazyObject
+from src.parallel import find_split, parse_parallel
+from src.parse_pool import ParsePool, parse_async, parse_many
+from src.pprint_objects import (
+    ObjectStream,
+    dump,
+    dumps,
+    pprint_dict,
+    pprint_list,
+)
+from src.profiling import ParseProfile
+from src.query import WILDCARD, compile_path
+from src.schema import Schema
+from src.stream_encoder import StreamEncoder, iter_encode_events, stream_dump
+from src.tape import build_tape_numpy, build_tape_python, np, walk_tape
 
 TEST_FILES_PATH = Path(__file__).parent / Path("test_files")
 
 
+@dataclasses.dataclass(slots=True)
+class Item:
+    sku: str
+    qty: int
+    price: float
+
+
+@dataclasses.dataclass(slots=True)
+class Order:
+    id: int
+    paid: bool
+    items: list[Item]
+    note: str | None = None
+    tags: list[str] = dataclasses.field(default_factory=list)
+
+
+@dataclasses.dataclass
+class TreeNode:
+    name: str
+    children: list["TreeNode"]
+
+
+@dataclasses.dataclass(kw_only=True)
+class Point:
+    x: int
+    y: int = 0
+    label: str
+
+
+@dataclasses.dataclass
+class Range:
+    low: int
+    high: int
+
+    def __post_init__(self) -> None:
+        if self.low > self.high:
+            raise ValueError("low is above high")
+
+
 class TestPyLispInterpreter(TestCase):
     """Test json-parser functionality."""
 
@@ -358,6 +424,20 @@ class TestPyLispInterpreter(TestCase):
         self.assertEqual(res, expected_result)
         self.assertEqual(remaining_str, jp.s)
 
+    @parameterized.expand(
+        [
+            ['{"key1": "value1"}, "rest"', 18],
+            ["[1, 2, 3]   ", 9],
+            ['"hello world", 5', 13],
+            ["-121e9, 5", 6],
+        ]
+    )
+    def test_parse_value_moves_ptr_only(self, s: str, expected_ptr: int) -> None:
+        jp = JsonParser(s)
+        jp.parse_value()
+        self.assertEqual(jp.ptr, expected_ptr)
+        self.assertIs(jp.buf, s)
+
     @parameterized.expand(
         [
             [os.path.join(TEST_FILES_PATH, "step1/valid1.json"), {}],
@@ -531,5 +611,1428 @@ class TestPyLispInterpreter(TestCase):
         )
 
 
+class TestJsonEvents(TestCase):
+    """Test the event stream produced by the parser."""
+
+    def test_iter_events(self) -> None:
+        jp = JsonParser('{"a": [1, "x", {}], "b": null}, "rest"')
+        self.assertEqual(
+            list(jp.iter_events()),
+            [
+                (JsonEvent.START_OBJECT, None),
+                (JsonEvent.KEY, "a"),
+                (JsonEvent.START_ARRAY, None),
+                (JsonEvent.VALUE, 1),
+                (JsonEvent.VALUE, "x"),
+                (JsonEvent.START_OBJECT, None),
+                (JsonEvent.END_OBJECT, None),
+                (JsonEvent.END_ARRAY, None),
+                (JsonEvent.KEY, "b"),
+                (JsonEvent.VALUE, "null"),
+                (JsonEvent.END_OBJECT, None),
+            ],
+        )
+        self.assertEqual(jp.s, ', "rest"')
+
+    @parameterized.expand(
+        [
+            ["5", 5],
+            ['"abc"', "abc"],
+            ["[[], [1, [2]]]", [[], [1, [2]]]],
+            ['{"k": {"k": [{"k": true}]}}', {"k": {"k": [{"k": True}]}}],
+        ]
+    )
+    def test_build_value(self, s: str, expected_result) -> None:
+        self.assertEqual(build_value(JsonParser(s).iter_events()), expected_result)
+
+    def test_count_records(self) -> None:
+        s = '{"records": [{"id": 1}, {"id": 2}, {"id": 3, "tags": [{}]}]}'
+        depth = 0
+        records = 0
+        for event, _ in JsonParser().iter_json_events(s):
+            if event in (JsonEvent.START_OBJECT, JsonEvent.START_ARRAY):
+                depth += 1
+                records += event is JsonEvent.START_OBJECT and depth == 3
+            elif event in (JsonEvent.END_OBJECT, JsonEvent.END_ARRAY):
+                depth -= 1
+        self.assertEqual(records, 3)
+
+    @parameterized.expand([[1000], [100000]])
+    def test_deep_nesting(self, depth: int) -> None:
+        s = '{"a": ' + "[" * depth + "]" * depth + "}"
+        res = JsonParser(max_depth=depth + 1).parse_text(s)
+        for _ in range(depth):
+            self.assertEqual(len(res), 1)
+            res = res["a"] if isinstance(res, dict) else res[0]
+        self.assertEqual(res, [])
+
+    @parameterized.expand([[None, 10000], [5, 5]])
+    def test_raise_max_depth_exceeded(self, max_depth: int | None, limit: int) -> None:
+        jp = JsonParser() if max_depth is None else JsonParser(max_depth=max_depth)
+        with self.assertRaises(JsonParseError) as context:
+            jp.parse_text('{"a": ' + "[" * 1000000)
+        self.assertEqual(
+            str(context.exception),
+            f"Maximum nesting depth of {limit} exceeded: invalid entry.",
+        )
+
+    @parameterized.expand(
+        [
+            ['{"key1": 5,}', "Trailing commas are not allowed."],
+            ["[1, 2]", 'JSON file is missing starting "{": invalid entry.'],
+            ['{"key1": nan}', "Value unable to be parsed: invalid entry."],
+        ]
+    )
+    def test_raise_iter_json_events(self, s: str, message: str) -> None:
+        with self.assertRaises(JsonParseError) as context:
+            list(JsonParser().iter_json_events(s))
+        self.assertEqual(str(context.exception), message)
+
+
+class TestNdjson(TestCase):
+    """Test JSON Lines parsing across shards and worker processes."""
+
+    def setUp(self) -> None:
+        lines = [f'{{"id": {i}, "name": "record {i}"}}' for i in range(200)]
+        lines[41] = '{"id": 41,}'
+        lines[150] = '{"id": 150'
+        f = tempfile.NamedTemporaryFile("w", suffix=".ndjson", delete=False)
+        f.write("\n".join(lines) + "\n")
+        f.close()
+        self.path = f.name
+
+    def tearDown(self) -> None:
+        os.remove(self.path)
+
+    def test_split_shards_on_line_boundaries(self) -> None:
+        shards = split_shards(self.path, shard_size=500)
+        self.assertGreater(len(shards), 1)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        for shard in shards:
+            self.assertEqual(data[shard.start - 1 : shard.start], b"\n"[: shard.start])
+            self.assertEqual(data[: shard.start].count(b"\n") + 1, shard.first_line)
+        self.assertEqual(shards[-1].end, len(data))
+
+    @parameterized.expand([[True], [False]])
+    def test_parse_ndjson(self, ordered: bool) -> None:
+        records = []
+        for shard_result in parse_ndjson(
+            self.path, workers=2, ordered=ordered, shard_size=500
+        ):
+            records.extend(shard_result.records)
+        if not ordered:
+            records.sort(key=lambda r: r.line)
+        self.assertEqual([r.line for r in records], list(range(1, 201)))
+        self.assertEqual(records[0].value, {"id": 0, "name": "record 0"})
+        self.assertEqual(
+            [(r.line, r.error) for r in records if r.error is not None],
+            [
+                (42, "Trailing commas are not allowed."),
+                (151, "Unexpected end of JSON input: invalid entry."),
+            ],
+        )
+
+
+class TestBytesJsonParser(TestCase):
+    """Test parsing bytes and memory-mapped files."""
+
+    @parameterized.expand(
+        [
+            [os.path.join(TEST_FILES_PATH, "step1/valid1.json")],
+            [os.path.join(TEST_FILES_PATH, "step3/valid.json")],
+            [os.path.join(TEST_FILES_PATH, "step4/valid3.json")],
+        ]
+    )
+    def test_parse_mmap_matches_parse_json(self, file_path: str) -> None:
+        res = BytesJsonParser().parse_mmap(file_path)
+        self.assertEqual(res, JsonParser().parse_json(file_path))
+
+    @parameterized.expand(
+        [
+            [os.path.join(TEST_FILES_PATH, "step1/invalid.json")],
+            [os.path.join(TEST_FILES_PATH, "step1/invalid2.json")],
+            [os.path.join(TEST_FILES_PATH, "step2/invalid.json")],
+            [os.path.join(TEST_FILES_PATH, "step2/invalid2.json")],
+            [os.path.join(TEST_FILES_PATH, "step3/invalid.json")],
+            [os.path.join(TEST_FILES_PATH, "step4/invalid5.json")],
+        ]
+    )
+    def test_parse_mmap_errors_match_parse_json(self, file_path: str) -> None:
+        with self.assertRaises(JsonParseError) as expected:
+            JsonParser().parse_json(file_path)
+        with self.assertRaises(JsonParseError) as context:
+            BytesJsonParser().parse_mmap(file_path)
+        self.assertEqual(str(context.exception), str(expected.exception))
+
+    @parameterized.expand(
+        [
+            [os.path.join(TEST_FILES_PATH, "step3/valid.json")],
+            ['{"a": 1, "b": ["é", 2.5]}'],
+            [b'{"a": 1, "b": ["\xc3\xa9", 2.5]}'],
+        ]
+    )
+    def test_parse_json_input(self, s: str | bytes) -> None:
+        text = s.decode("utf-8") if isinstance(s, bytes) else s
+        self.assertEqual(BytesJsonParser().parse_json(s), JsonParser().parse_json(text))
+
+    def test_query_and_events_from_path(self) -> None:
+        path = os.path.join(TEST_FILES_PATH, "step4/valid3.json")
+        self.assertEqual(
+            BytesJsonParser().query_json(path, ["$.*"]),
+            JsonParser().query_json(path, ["$.*"]),
+        )
+        self.assertEqual(
+            list(BytesJsonParser().iter_json_events(path)),
+            list(JsonParser().iter_json_events(path)),
+        )
+
+    @parameterized.expand(
+        [
+            ['{"caf\u00e9": "\u2603", "n": [-5, 5.55, 1e9, true, false, null]}'],
+            ['{"key1": "true", "key2": {"k": 5}, "key3": 42, "key4": {}}'],
+            ['{"a": [1e9, -213431e9, 1445e93232, -121e9, 5-, 12e90]}'],
+            ['{"a": 5.5.55}'],
+            ['{"a": 1e9e}'],
+            ['{"a": -121e9.87}'],
+            ['{"a": 5-5}'],
+        ]
+    )
+    def test_parse_bytes_matches_parse_text(self, s: str) -> None:
+        try:
+            expected = JsonParser().parse_text(s)
+        except (JsonParseError, ValueError) as e:
+            with self.assertRaises(type(e)):
+                BytesJsonParser(s.encode("utf-8")).parse_object()
+        else:
+            jp = BytesJsonParser(s.encode("utf-8"))
+            self.assertEqual(jp.parse_object(), expected)
+
+    @parameterized.expand(
+        [
+            [bytes],
+            [bytearray],
+            [memoryview],
+            [lambda b: memoryview(bytearray(b))],
+            [lambda b: memoryview(b"  " + b)[2:]],
+            [lambda b: memoryview(b).cast("c")],
+        ]
+    )
+    def test_parse_bytes_accepts_buffers(self, wrap) -> None:
+        s = '{"caf\u00e9": "\u2603", "n": [-5, 5.55, 1e9, true, false, null]}'
+        res = BytesJsonParser().parse_bytes(wrap(s.encode("utf-8")))
+        self.assertEqual(res, JsonParser().parse_text(s))
+
+    def test_parse_bytes_releases_buffer(self) -> None:
+        buf = bytearray(b'{"a": 1}')
+        view = memoryview(buf)
+        BytesJsonParser().parse_bytes(view)
+        view.release()
+        buf.extend(b" ")
+
+    @parameterized.expand(
+        [
+            [os.path.join(TEST_FILES_PATH, "step3/valid.json")],
+            [os.path.join(TEST_FILES_PATH, "step4/valid3.json")],
+        ]
+    )
+    def test_parse_file_matches_parse_json(self, file_path: str) -> None:
+        expected = JsonParser().parse_json(file_path)
+        self.assertEqual(JsonParser().parse_file(file_path), expected)
+        self.assertEqual(BytesJsonParser().parse_file(file_path), expected)
+
+    def test_parse_file_never_reads_text_as_path(self) -> None:
+        with self.assertRaises(FileNotFoundError):
+            JsonParser().parse_file('{"a": 1}')
+
+
+class TestQuery(TestCase):
+    """Test extracting values by path without building the whole tree."""
+
+    DOC = (
+        '{"user": {"id": 42, "name": "x"}, '
+        '"items": [{"price": 1.5}, {"price": 3, "x": [1, {"y": "]}"}]}], '
+        '"skipped": {"a": [[["{"]]], "b": "["}}'
+    )
+
+    @parameterized.expand(
+        [
+            ["$", ()],
+            ["$.user.id", ("user", "id")],
+            ["$.items[*].price", ("items", WILDCARD, "price")],
+            ["$['a.b'][0].*", ("a.b", 0, WILDCARD)],
+            ['$["0"]', ("0",)],
+        ]
+    )
+    def test_compile_path(self, expr: str, expected_result: tuple) -> None:
+        self.assertEqual(compile_path(expr), expected_result)
+
+    @parameterized.expand([["user.id"], ["$.user..id"], ["$[x]"], ["$.items["]])
+    def test_raise_invalid_path(self, expr: str) -> None:
+        with self.assertRaises(JsonPathError):
+            compile_path(expr)
+
+    @parameterized.expand(
+        [
+            ["$.user.id", [42]],
+            ["$.items[*].price", [1.5, 3]],
+            ["$.items[1].x[1].y", ["]}"]],
+            ["$.items[0]", [{"price": 1.5}]],
+            ["$.items[5]", []],
+            ["$.user[0]", []],
+            ["$.nope.id", []],
+            ["$.skipped.*", [[[["{"]]], "["]],
+        ]
+    )
+    def test_query_json(self, path: str, expected_result: list) -> None:
+        res = JsonParser().query_json(self.DOC, [path])
+        self.assertEqual(res, {path: expected_result})
+        jp = BytesJsonParser(self.DOC.encode("utf-8"))
+        jp.check_document()
+        matches = [[]]
+        jp.select_value([compile_path(path)], [(0, 0)], matches)
+        self.assertEqual(matches[0], expected_result)
+
+    def test_query_json_several_paths(self) -> None:
+        paths = ["$.items", "$.items[*].price", "$.user.name"]
+        res = JsonParser().query_json(self.DOC, paths)
+        self.assertEqual(res["$.items[*].price"], [1.5, 3])
+        self.assertEqual(res["$.user.name"], ["x"])
+        self.assertEqual(len(res["$.items"][0]), 2)
+
+    @parameterized.expand(
+        [
+            ['{"a": {"b": "open}}', "String is missing close quote."],
+            ['{"a": [[1, 2]', "Unexpected end of JSON input: invalid entry."],
+            ['{"a": nope, "id": 1}', "Value unable to be parsed: invalid entry."],
+            ['{"a": 1, id: 1}', "Keys must be valid strings."],
+            ['{"a": 1,}', "Trailing commas are not allowed."],
+        ]
+    )
+    def test_raise_query_json(self, s: str, message: str) -> None:
+        with self.assertRaises(JsonParseError) as context:
+            JsonParser().query_json(s, ["$.id"])
+        self.assertEqual(str(context.exception), message)
+
+
+class TestLazyParsing(TestCase):
+    """Test lazy proxies that decode containers on first access."""
+
+    @parameterized.expand(
+        [
+            [os.path.join(TEST_FILES_PATH, "step3/valid.json")],
+            [os.path.join(TEST_FILES_PATH, "step4/valid3.json")],
+        ]
+    )
+    def test_lazy_matches_parse_json(self, file_path: str) -> None:
+        res = JsonParser(lazy=True).parse_json(file_path)
+        self.assertIsInstance(res, LazyObject)
+        self.assertEqual(res, JsonParser().parse_json(file_path))
+        self.assertEqual(res.to_python(), JsonParser().parse_json(file_path))
+
+    def test_children_decoded_once_on_access(self) -> None:
+        jp = JsonParser('{"a": [1, {"b": "x"}, [2]], "c": null} rest', lazy=True)
+        res = jp.parse_object()
+        self.assertEqual(jp.s, " rest")
+        self.assertEqual(res.cache, {})
+        self.assertIsInstance(res["a"], LazyArray)
+        self.assertIs(res["a"], res["a"])
+        self.assertEqual(res["a"][1]["b"], "x")
+        self.assertEqual(res["a"][-1], [2])
+        self.assertEqual(res["a"][0:2], [1, {"b": "x"}])
+        self.assertEqual(list(res), ["a", "c"])
+        self.assertEqual(res["c"], "null")
+        with self.assertRaises(IndexError):
+            res["a"][3]
+        with self.assertRaises(KeyError):
+            res["d"]
+
+    def test_errors_raised_on_access(self) -> None:
+        res = JsonParser(lazy=True).parse_text('{"a": {"b": nope}, "c": 1}')
+        self.assertEqual(res["c"], 1)
+        with self.assertRaises(JsonParseError) as context:
+            res["a"]["b"]
+        self.assertEqual(
+            str(context.exception), "Value unable to be parsed: invalid entry."
+        )
+
+    def test_lazy_bytes(self) -> None:
+        jp = BytesJsonParser('{"k": ["caf\u00e9", 1.5]}'.encode("utf-8"), lazy=True)
+        self.assertEqual(jp.parse_object()["k"][0], "caf\u00e9")
+
+
+class TestKeyCache(TestCase):
+    """Test interning object keys through a shared LRU cache."""
+
+    def test_keys_shared_across_records_and_parses(self) -> None:
+        jp = JsonParser(key_cache=KeyCache())
+        s = '{"records": [' + ", ".join(['{"id": 1, "name": "a"}'] * 3) + "]}"
+        first = jp.parse_json(s)["records"]
+        second = jp.parse_json(s)["records"]
+        ids = [next(iter(r)) for r in first + second]
+        self.assertTrue(all(k is ids[0] for k in ids))
+        self.assertEqual(
+            jp.key_cache.stats(),
+            {"hits": 11, "misses": 3, "evictions": 0, "size": 3, "maxsize": 4096},
+        )
+
+    def test_least_recently_used_key_evicted(self) -> None:
+        cache = KeyCache(maxsize=2)
+        a = cache.intern("".join(["a", "b"]))
+        cache.intern("cd")
+        self.assertIs(cache.intern("".join(["a", "b"])), a)
+        cache.intern("ef")
+        self.assertEqual(list(cache.keys), ["ab", "ef"])
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (1, 3, 1))
+
+    def test_lazy_proxies_use_key_cache(self) -> None:
+        cache = KeyCache()
+        res = JsonParser(lazy=True, key_cache=cache).parse_text('{"a": {"a": 1}}')
+        self.assertEqual(res["a"]["a"], 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+
+class TestParseCache(TestCase):
+    """Test memoizing parse results by content hash or file metadata."""
+
+    def test_hits_return_independent_copies(self) -> None:
+        jp = JsonParser(result_cache=ParseCache())
+        s = '{"a": [1, {"b": []}], "c": "d"}'
+        first = jp.parse_json(s)
+        first["a"][1]["b"].append(2)
+        second = jp.parse_json(s)
+        self.assertEqual(second, {"a": [1, {"b": []}], "c": "d"})
+        second["a"].clear()
+        self.assertEqual(jp.parse_json("".join(s))["a"], [1, {"b": []}])
+        self.assertEqual(
+            jp.result_cache.stats(),
+            {
+                "hits": 2,
+                "misses": 1,
+                "evictions": 0,
+                "expirations": 0,
+                "size": 1,
+                "maxsize": 128,
+            },
+        )
+
+    def test_file_parsed_again_after_change(self) -> None:
+        jp = JsonParser(result_cache=ParseCache())
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "config.json")
+            Path(path).write_text('{"v": 1}')
+            self.assertEqual(jp.parse_json(path), {"v": 1})
+            self.assertEqual(jp.parse_json(path), {"v": 1})
+            Path(path).write_text('{"v": 22}')
+            self.assertEqual(jp.parse_json(path), {"v": 22})
+        self.assertEqual((jp.result_cache.hits, jp.result_cache.misses), (1, 2))
+
+    def test_least_recently_used_result_evicted(self) -> None:
+        jp = JsonParser(result_cache=ParseCache(maxsize=2))
+        for s in ['{"a": 1}', '{"b": 1}', '{"a": 1}', '{"c": 1}', '{"a": 1}']:
+            jp.parse_json(s)
+        cache = jp.result_cache
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (2, 3, 1))
+        self.assertEqual(len(cache.entries), 2)
+
+    def test_expired_result_parsed_again(self) -> None:
+        jp = JsonParser(result_cache=ParseCache(ttl=0))
+        jp.parse_json('{"a": 1}')
+        self.assertEqual(jp.parse_json('{"a": 1}'), {"a": 1})
+        self.assertEqual(jp.result_cache.expirations, 1)
+        self.assertEqual(jp.result_cache.hits, 0)
+
+    def test_errors_not_cached(self) -> None:
+        jp = JsonParser(result_cache=ParseCache())
+        for _ in range(2):
+            with self.assertRaises(JsonParseError):
+                jp.parse_json('{"a": 1,}')
+        self.assertEqual(len(jp.result_cache.entries), 0)
+
+    def test_shared_between_parsers_with_different_options(self) -> None:
+        cache = ParseCache()
+        s = '{"r": [{"a": 1}, {"a": 2}]}'
+        lazy = JsonParser(lazy=True, result_cache=cache).parse_json(s)
+        columnar = JsonParser(columnar=True, result_cache=cache).parse_json(s)
+        plain = JsonParser(result_cache=cache).parse_json(s)
+        self.assertIsInstance(lazy, LazyObject)
+        self.assertIsInstance(columnar["r"], ColumnarTable)
+        self.assertEqual(plain, {"r": [{"a": 1}, {"a": 2}]})
+        # proxies can't be copied, so only the plain result is stored
+        self.assertEqual(len(cache.entries), 1)
+        self.assertIsNot(JsonParser(lazy=True, result_cache=cache).parse_json(s), lazy)
+        self.assertEqual(cache.hits, 0)
+
+        with self.assertRaises(JsonParseError):
+            JsonParser(max_depth=2, result_cache=cache).parse_json(s)
+        self.assertEqual(JsonParser(result_cache=cache).parse_json(s), plain)
+        self.assertEqual(cache.hits, 1)
+
+
+class TestColumnar(TestCase):
+    """Test columnar output for arrays of records with the same keys."""
+
+    ROWS = (
+        '[{"id": 1, "p": 1.5, "ok": true, "name": "a", "x": null}, '
+        '{"id": 2, "p": 2, "ok": false, "name": "null", "x": null}, '
+        '{"name": "c", "id": 3, "p": null, "ok": true, "x": 5}]'
+    )
+
+    def test_record_array_stored_by_column(self) -> None:
+        res = JsonParser(self.ROWS, columnar=True).parse_list()
+        self.assertIsInstance(res, ColumnarTable)
+        self.assertEqual(res, JsonParser(self.ROWS).parse_list())
+        columns = res.columns
+        self.assertEqual(columns["id"].values.tolist(), [1, 2, 3])
+        self.assertEqual(columns["p"].kind, "float")
+        self.assertEqual(columns["p"].values.tolist(), [1.5, 2.0, 0.0])
+        self.assertEqual(columns["ok"].to_list(), [True, False, True])
+        self.assertEqual(columns["name"].values, ["a", "null", "c"])
+        self.assertEqual(
+            [columns["x"].is_null(i) for i in range(3)], [True, True, False]
+        )
+        self.assertEqual(res[-1]["x"], 5)
+
+    @parameterized.expand(
+        [
+            ["[1, 2, 3.5]", "float", [1.0, 2.0, 3.5]],
+            ["[1.5, null, 2]", "float", [1.5, 0.0, 2.0]],
+            ["[1, null, 2]", "int", [1, 0, 2]],
+        ]
+    )
+    def test_number_column_kinds(self, values: str, kind: str, stored: list) -> None:
+        s = "[" + ", ".join(f'{{"v": {v}}}' for v in values[1:-1].split(", ")) + "]"
+        res = JsonParser(s, columnar=True).parse_list()
+        self.assertEqual(res.columns["v"].kind, kind)
+        self.assertEqual(res.columns["v"].values.tolist(), stored)
+
+    @parameterized.expand([[1], [2], [3], [4]])
+    def test_max_depth_honored(self, max_depth: int) -> None:
+        s = '{"a": {"rows": [{"x": 1}, {"x": 2}]}}'
+        try:
+            expected = JsonParser(max_depth=max_depth).parse_json(s)
+        except JsonParseError as e:
+            with self.assertRaises(JsonParseError) as context:
+                JsonParser(max_depth=max_depth, columnar=True).parse_json(s)
+            self.assertEqual(str(context.exception), str(e))
+        else:
+            res = JsonParser(max_depth=max_depth, columnar=True).parse_json(s)
+            self.assertEqual(res, expected)
+
+    def test_nested_record_arrays_found(self) -> None:
+        s = '{"meta": {"n": 3}, "data": {"rows": ' + self.ROWS + "}}"
+        res = JsonParser(columnar=True).parse_json(s)
+        self.assertIsInstance(res["data"]["rows"], ColumnarTable)
+        self.assertEqual(res, JsonParser().parse_json(s))
+
+    @parameterized.expand(
+        [
+            ["[]"],
+            ["[1, 2, 3]"],
+            ["[{}, {}]"],
+            ['[{"a": 1}, {"b": 1}]'],
+            ['[{"a": 1, "b": 2}, {"a": 1}]'],
+            ['[{"a": 1}, {"a": 1, "b": 2}]'],
+            ['[{"a": 1, "a": 2}, {"a": 1}]'],
+            ['[{"a": 1}, {"a": "1"}]'],
+            ['[{"a": true}, {"a": 1}]'],
+            ['[{"a": [1]}, {"a": [2]}]'],
+            ['[{"a": 1}, {"a": 1e30}]'],
+            ['[{"a": 1}, 5]'],
+        ]
+    )
+    def test_other_arrays_built_as_lists(self, s: str) -> None:
+        res = JsonParser(s, columnar=True).parse_list()
+        self.assertIsInstance(res, list)
+        self.assertEqual(res, JsonParser(s).parse_list())
+
+    @parameterized.expand(
+        [
+            ['{"r": [{"a": 1}, {"a": 1,}]}', "Trailing commas are not allowed."],
+            [
+                '{"r": [{"a": 1}, {"a": nope}]}',
+                "Value unable to be parsed: invalid entry.",
+            ],
+        ]
+    )
+    def test_raise_invalid_record(self, s: str, message: str) -> None:
+        with self.assertRaises(JsonParseError) as context:
+            JsonParser(columnar=True).parse_json(s)
+        self.assertEqual(str(context.exception), message)
+
+
+class TestCompact(TestCase):
+    """Test the flat, array-backed representation of parsed documents."""
+
+    DOC = (
+        '{"a": [1, 2.5, "x", true, false, null, {"k": []}], "b": {"c": {}}, '
+        '"big": 12e30, "d": 1, "d": 2}'
+    )
+
+    def test_views_match_parsed_values(self) -> None:
+        res = JsonParser(compact=True).parse_json(self.DOC)
+        expected = JsonParser().parse_json(self.DOC)
+        self.assertIsInstance(res, CompactObject)
+        self.assertIsInstance(res["a"], CompactArray)
+        self.assertEqual(res, expected)
+        self.assertEqual(res.to_python(), expected)
+        self.assertEqual(list(res), ["a", "b", "big", "d"])
+        self.assertEqual(res["a"][-1]["k"], [])
+        self.assertEqual(res["a"][1:3], [2.5, "x"])
+        self.assertEqual(res["big"], 12e30)
+        self.assertEqual(res["d"], 2)
+        self.assertNotIn("e", res)
+        with self.assertRaises(IndexError):
+            res["a"][7]
+
+    def test_nodes_have_no_instance_dict(self) -> None:
+        res = JsonParser(compact=True).parse_json(self.DOC)
+        self.assertFalse(hasattr(res, "__dict__"))
+        self.assertEqual(len(res.tree.kinds), 15)
+
+    def test_bytes_parser(self) -> None:
+        res = BytesJsonParser(self.DOC.encode(), compact=True).parse_object()
+        self.assertEqual(res.to_python(), JsonParser(self.DOC).parse_object())
+
+    def test_narrow_objects_not_indexed(self) -> None:
+        rows = ", ".join(f'{{"id": {i}, "name": "n{i}"}}' for i in range(1000))
+        res = JsonParser(compact=True).parse_json('{"rows": [' + rows + "]}")["rows"]
+        self.assertEqual([r["name"] for r in res], [f"n{i}" for i in range(1000)])
+        self.assertNotIn("other", res[0])
+        self.assertEqual(res.tree.slots, {})
+
+    def test_wide_object_indexed(self) -> None:
+        n = 2 * MIN_INDEXED_WIDTH
+        s = "{" + ", ".join(f'"k{i}": {i}' for i in range(n)) + ', "k0": -1}'
+        res = JsonParser(compact=True).parse_json(s)
+        self.assertEqual(res["k0"], -1)
+        self.assertEqual([res[f"k{i}"] for i in range(1, n)], list(range(1, n)))
+        self.assertNotIn("other", res)
+        self.assertEqual(len(res.tree.slots), 1)
+
+    def test_deep_nesting_converted(self) -> None:
+        s = "[" * 3000 + "]" * 3000
+        res = JsonParser(s, compact=True).parse_list().to_python()
+        for _ in range(2999):
+            res = res[0]
+        self.assertEqual(res, [])
+
+
+class TestSerializer(TestCase):
+    """Test writing values back out as JSON text."""
+
+    VALUE = {"a": [1, 2.5, "x", True, False, None, {"k": []}], "b": {}}
+
+    @parameterized.expand(
+        [
+            [None, '{"a":[1,2.5,"x",true,false,null,{"k":[]}],"b":{}}'],
+            [
+                2,
+                '{\n  "a": [\n    1,\n    2.5,\n    "x",\n    true,\n    false,'
+                '\n    null,\n    {\n      "k": []\n    }\n  ],\n  "b": {}\n}',
+            ],
+        ]
+    )
+    def test_dumps(self, indent: int | None, expected: str) -> None:
+        self.assertEqual(dumps(self.VALUE, indent), expected)
+
+    @parameterized.expand(
+        [
+            ["plain", '"plain"'],
+            ['say "hi"', '"say \\"hi\\""'],
+            ["a\\b\nc\td\x01", '"a\\\\b\\nc\\td\\u0001"'],
+            ["h\u00e9", '"h\u00e9"'],
+        ]
+    )
+    def test_strings_escaped(self, s: str, expected: str) -> None:
+        self.assertEqual(dumps(s), expected)
+
+    def test_round_trip(self) -> None:
+        s = (TEST_FILES_PATH / "step4" / "valid3.json").read_text()
+        res = JsonParser().parse_json(s)
+        self.assertEqual(JsonParser().parse_json(dumps(res, indent=4)), res)
+
+    def test_out_of_range_floats_round_trip(self) -> None:
+        res = JsonParser().parse_json('{"a": 1e400, "b": [-1e400, 1.5]}')
+        self.assertEqual(dumps(res), '{"a":1e999,"b":[-1e999,1.5]}')
+        self.assertEqual(JsonParser().parse_json(dumps(res)), res)
+
+    def test_old_pprint_signatures(self) -> None:
+        # the 'depth' and 'is_in_array' parameters are still accepted
+        out = StringIO()
+        pprint_dict({"a": [1]}, 0, f=out)
+        pprint_list([1, {"b": 2}], False, 0, f=out)
+        pprint_list([3], f=out)
+        self.assertEqual(
+            out.getvalue(),
+            dumps({"a": [1]}, 4) + "\n" + dumps([1, {"b": 2}], 4) + "\n[\n    3\n]\n",
+        )
+
+    def test_views_written_as_containers(self) -> None:
+        s = '{"a": [1, {"b": true}], "c": {}}'
+        for jp in [JsonParser(lazy=True), JsonParser(compact=True)]:
+            self.assertEqual(dumps(jp.parse_json(s)), '{"a":[1,{"b":true}],"c":{}}')
+
+    def test_deep_nesting(self) -> None:
+        value: list = []
+        inner = value
+        for _ in range(5000):
+            inner.append([])
+            inner = inner[0]
+        self.assertEqual(dumps(value), "[" * 5001 + "]" * 5001)
+
+    def test_dump_writes_in_chunks(self) -> None:
+        writes = []
+
+        class Sink(object):
+            def write(self, s: str) -> None:
+                writes.append(s)
+
+        value = [{"id": i, "name": "n" * 10} for i in range(1000)]
+        dump(value, Sink(), chunk_size=4096)
+        self.assertEqual("".join(writes), dumps(value))
+        self.assertLess(len(writes), 10)
+
+    @parameterized.expand(
+        [
+            [float("nan"), ValueError],
+            [{1: "a"}, TypeError],
+            [{"a": b"x"}, TypeError],
+            [{"a": {1, 2}}, TypeError],
+        ]
+    )
+    def test_raise_unserializable(self, value, error: type) -> None:
+        with self.assertRaises(error):
+            dumps(value)
+
+    def test_raise_circular_reference(self) -> None:
+        value: dict = {"a": []}
+        value["a"].append(value)
+        with self.assertRaises(ValueError) as context:
+            dumps(value)
+        self.assertEqual(str(context.exception), "Circular reference detected.")
+        # a container repeated side by side is not a cycle
+        shared = [1]
+        self.assertEqual(dumps([shared, shared]), "[[1],[1]]")
+
+
+class TestStreamEncoder(TestCase):
+    """Test writing JSON from generators and event streams as it is produced."""
+
+    def test_generators_written_as_containers(self) -> None:
+        value = ObjectStream((f"k{i}", ({"id": j} for j in range(2))) for i in range(2))
+        out = StringIO()
+        stream_dump(value, out)
+        self.assertEqual(
+            out.getvalue(), '{"k0":[{"id":0},{"id":1}],"k1":[{"id":0},{"id":1}]}'
+        )
+
+    def test_dump_to_binary_file(self) -> None:
+        value = {"name": "caf\u00e9", "ids": (i for i in range(3))}
+        out = BytesIO()
+        stream_dump(value, out, encoding="utf-8")
+        self.assertEqual(out.getvalue(), '{"name":"caf\u00e9","ids":[0,1,2]}'.encode())
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.json")
+            with open(path, "wb") as f:
+                stream_dump({"a": [1]}, f, indent=2, encoding="utf-8")
+            self.assertEqual(BytesJsonParser().parse_file(path), {"a": [1]})
+
+    def test_output_flushed_in_bounded_chunks(self) -> None:
+        writes = []
+
+        class Sink(object):
+            def write(self, s: str) -> None:
+                writes.append(s)
+
+        encoder = StreamEncoder(Sink(), flush_size=1000)
+        encoder.encode({"n": i, "s": "x" * 50} for i in range(1000))
+        self.assertLessEqual(sum(len(p) for p in encoder.parts), 1000)
+        encoder.flush()
+        self.assertTrue(all(len(w) < 1100 for w in writes))
+        self.assertEqual(encoder.written, sum(len(w) for w in writes))
+        self.assertEqual(
+            JsonParser().parse_json('{"a": ' + "".join(writes) + "}")["a"][-1],
+            {"n": 999, "s": "x" * 50},
+        )
+
+    def test_bytes_written_with_encoding(self) -> None:
+        out = BytesIO()
+        with StreamEncoder(out, encoding="utf-8") as encoder:
+            encoder.encode(["h\u00e9"])
+        self.assertEqual(out.getvalue(), '["h\u00e9"]'.encode("utf-8"))
+
+    @parameterized.expand([[None], [4]])
+    def test_events_written_back_out(self, indent: int | None) -> None:
+        s = '{"a": [1, {"b": [], "c": {}}, "s"], "d": true, "e": {"f": 2.5}}'
+        out = "".join(iter_encode_events(JsonParser().iter_json_events(s), indent))
+        self.assertEqual(out, dumps(JsonParser().parse_json(s), indent))
+
+    def test_incremental_parse_pipeline(self) -> None:
+        src = StringIO('{"id": 1} {"id": 2}\n{"id": 3}')
+        out = StringIO()
+        with StreamEncoder(out) as encoder:
+            encoder.encode({"id": r["id"] * 10} for r in iter_json_stream(src))
+        self.assertEqual(out.getvalue(), '[{"id":10},{"id":20},{"id":30}]')
+
+
+class TestParsePool(TestCase):
+    """Test parsing many documents at once on thread and process pools."""
+
+    DOCS = [
+        '{"a": 1}',
+        '{"b": [1, 2, {"c": "d"}]}',
+        b'{"caf\xc3\xa9": true}',
+        '{"e": {}, "f": null}',
+    ]
+
+    def expected(self) -> list:
+        return [
+            {"a": 1},
+            {"b": [1, 2, {"c": "d"}]},
+            {"caf\u00e9": True},
+            {"e": {}, "f": "null"},
+        ]
+
+    @parameterized.expand([[False, 0], [False, 20], [True, 20]])
+    def test_parse_many_keeps_order(self, processes: bool, threshold: int) -> None:
+        res = parse_many(
+            self.DOCS, workers=2, processes=processes, inline_threshold=threshold
+        )
+        self.assertEqual(res, self.expected())
+
+    def test_parse_many_raises_first_error(self) -> None:
+        with ParsePool(workers=2, inline_threshold=10) as pool:
+            with self.assertRaises(JsonParseError) as context:
+                pool.parse_many(['{"a": 1,}', '{"a": "b}', '{"a": 1}'])
+        self.assertEqual(str(context.exception), "Trailing commas are not allowed.")
+
+    def test_parse_async(self) -> None:
+        async def run() -> tuple[list, list]:
+            with ParsePool(workers=2, inline_threshold=20) as pool:
+                pooled = await asyncio.gather(
+                    *[pool.parse_async(doc) for doc in self.DOCS]
+                )
+            default = await asyncio.gather(
+                *[parse_async(doc, inline_threshold=0) for doc in self.DOCS]
+            )
+            return pooled, default
+
+        pooled, default = asyncio.run(run())
+        self.assertEqual(pooled, self.expected())
+        self.assertEqual(default, self.expected())
+
+
+class TestParallel(TestCase):
+    """Test splitting one large document across worker processes."""
+
+    ROWS = ", ".join(f'{{"id": {i}, "tags": ["]{i}", {{}}]}}' for i in range(100))
+
+    def parse(self, s: str) -> tuple:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "doc.json")
+            Path(path).write_text(s)
+            res = parse_parallel(path, workers=2, threshold=0)
+            return res, BytesJsonParser().parse_mmap(path)
+
+    @parameterized.expand(
+        [
+            ['{"meta": {"n": 1}, "rows": [' + ROWS + '], "tail": [1]}'],
+            ['{"a": {"b": {"c": [' + ROWS + "]}}}"],
+            ["{" + ", ".join(f'"k{i}": [{i}]' for i in range(100)) + "}"],
+            ['{"rows": [' + ROWS + ', ], "rows": 2}'],
+            ['{"rows": [1 2 3 [4] 5, 6, 7, 8, 9, 10, 11, 12]}'],
+            ['{"a": "x", "b": "y"}'],
+            ["{}"],
+        ]
+    )
+    def test_matches_sequential_parse(self, s: str) -> None:
+        res, expected = self.parse(s)
+        self.assertEqual(res, expected)
+
+    def test_split_found_below_root(self) -> None:
+        s = '{"meta": {"n": 1}, "rows": [' + self.ROWS + '], "tail": [1]}'
+        jp = BytesJsonParser(s.encode())
+        split = find_split(jp, 2)
+        self.assertEqual(split.path, ["rows"])
+        self.assertEqual(len(split.members), 100)
+        self.assertFalse(split.is_object)
+
+    @parameterized.expand(
+        [
+            ['{"rows": [' + ROWS + ', {"a": 1,}]}', "Trailing commas are not allowed."],
+            ["{" + '"a": 1, ' * 20 + "}", "Trailing commas are not allowed."],
+            ['{"rows": [' + ROWS + ', "a]}', "String is missing close quote."],
+        ]
+    )
+    def test_raise_invalid(self, s: str, message: str) -> None:
+        with self.assertRaises(JsonParseError) as context:
+            self.parse(s)
+        self.assertEqual(str(context.exception), message)
+
+    @parameterized.expand(
+        [
+            ['{"rows": [' + ROWS + ', {"a": 1,}], "b": @}'],
+            ['{"a": @, "rows": [' + ROWS + ', {"a": 1,}]}'],
+            ['{"rows": [' + ROWS + '], "b": @, "c": 1,}'],
+        ]
+    )
+    def test_first_error_raised(self, s: str) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "doc.json")
+            Path(path).write_text(s)
+            with self.assertRaises(JsonParseError) as expected:
+                BytesJsonParser().parse_mmap(path)
+            with self.assertRaises(JsonParseError) as context:
+                parse_parallel(path, workers=2, threshold=0)
+        self.assertEqual(str(context.exception), str(expected.exception))
+        self.assertEqual(context.exception.offset, expected.exception.offset)
+
+
+class TestTape(TestCase):
+    """Test two-stage parsing over an index of structural characters."""
+
+    DOC = b'{"a": [1, -2.5, "x]{,:", true, null], "b" {"c": {}} "d": "\xc3\xa9"}'
+
+    def walk(self, s: bytes, build, max_depth: int = 100) -> dict:
+        jp = BytesJsonParser(s, max_depth)
+        jp.check_document()
+        return walk_tape(jp, build(s))
+
+    def test_python_tape(self) -> None:
+        tape = build_tape_python(b'{"a": [1, "]"]}')
+        self.assertEqual(tape.tolist(), [0, 1, 3, 4, 6, 8, 10, 12, 13, 14])
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_numpy_tape_matches_python_tape(self) -> None:
+        for s in [self.DOC, b'{"a": "b', b"{" + b'"x", ' * 300000 + b"}"]:
+            self.assertEqual(build_tape_numpy(s), build_tape_python(s))
+
+    @parameterized.expand(
+        [
+            [os.path.join(TEST_FILES_PATH, "step3/valid.json")],
+            [os.path.join(TEST_FILES_PATH, "step4/valid3.json")],
+        ]
+    )
+    def test_parse_tape_matches_parse_file(self, file_path: str) -> None:
+        s = Path(file_path).read_bytes()
+        expected = JsonParser().parse_file(file_path)
+        self.assertEqual(BytesJsonParser().parse_tape(s), expected)
+        self.assertEqual(self.walk(s, build_tape_python), expected)
+
+    def test_parse_tape_matches_parse_bytes(self) -> None:
+        expected = BytesJsonParser().parse_bytes(self.DOC)
+        self.assertEqual(BytesJsonParser().parse_tape(self.DOC), expected)
+        self.assertEqual(self.walk(self.DOC, build_tape_python), expected)
+
+    @parameterized.expand(
+        [
+            ['{"key1": 5, "key2": true,}', "Trailing commas are not allowed."],
+            ['{"a": [1, 2], }', "Trailing commas are not allowed."],
+            ['{"key1": value1"}', "Value unable to be parsed: invalid entry."],
+            ['{"key1": 5.5.5..5}', "Value unable to be parsed: invalid entry."],
+            ['{key1: "value1"}', "Keys must be valid strings."],
+            ['{"a": 1 2}', "Keys must be valid strings."],
+            ['{"a": "b}', "String is missing close quote."],
+            ['{"a": [[[1]]]}', "Maximum nesting depth of 3 exceeded: invalid entry."],
+        ]
+    )
+    def test_raise_same_errors(self, s: str, message: str) -> None:
+        with self.assertRaises(JsonParseError) as context:
+            BytesJsonParser(max_depth=3).parse_tape(s.encode())
+        self.assertEqual(str(context.exception), message)
+        with self.assertRaises(JsonParseError) as context:
+            self.walk(s.encode(), build_tape_python, max_depth=3)
+        self.assertEqual(str(context.exception), message)
+
+
+class TestProfile(TestCase):
+    """Test per-method profiling of the parser."""
+
+    DOC = '{"a": [1, {"b": true}], "c": "d"}'
+
+    def test_counts_calls_bytes_and_depth(self) -> None:
+        profile = ParseProfile()
+        jp = JsonParser(profile=profile)
+        self.assertEqual(jp.parse_text(self.DOC), JsonParser().parse_text(self.DOC))
+        stats = profile.as_dict()
+        methods = stats["methods"]
+        self.assertEqual(stats["max_depth"], 3)
+        self.assertEqual(methods["parse_object"]["calls"], 1)
+        self.assertEqual(methods["parse_object"]["bytes"], len(self.DOC))
+        self.assertEqual(methods["parse_key"]["calls"], 3)
+        self.assertEqual(methods["parse_string"]["calls"], 4)
+        self.assertEqual(methods["parse_string"]["bytes"], 12)
+        self.assertEqual(methods["check_document"]["max_depth"], 0)
+        self.assertEqual(methods["parse_reserved_word"]["max_depth"], 3)
+        self.assertEqual(methods["parse_list"]["calls"], 0)
+        for method in methods.values():
+            self.assertLessEqual(method["self_seconds"], method["seconds"])
+
+    def test_shared_between_parsers_and_reset(self) -> None:
+        profile = ParseProfile()
+        JsonParser(profile=profile).parse_text(self.DOC)
+        BytesJsonParser(profile=profile).parse_bytes(self.DOC.encode())
+        self.assertEqual(profile.methods["parse_key"].calls, 6)
+        profile.reset()
+        self.assertEqual(profile.methods["parse_key"].calls, 0)
+        self.assertEqual(profile.max_depth, 0)
+
+    def test_unprofiled_parser_unchanged(self) -> None:
+        jp = JsonParser()
+        JsonParser(profile=ParseProfile())
+        self.assertNotIn("parse_string", vars(jp))
+        self.assertIsNone(jp.profile)
+
+    def test_failed_parse_leaves_profile_usable(self) -> None:
+        profile = ParseProfile()
+        jp = JsonParser(profile=profile)
+        with self.assertRaises(JsonParseError):
+            jp.parse_text('{"a": [1, {"b": tru}]}')
+        self.assertEqual((profile.depth, profile.frames), (0, []))
+        self.assertEqual(jp.parse_text(self.DOC)["c"], "d")
+
+    def test_prometheus_text(self) -> None:
+        profile = ParseProfile()
+        JsonParser(profile=profile).parse_text(self.DOC)
+        lines = profile.to_prometheus().splitlines()
+        self.assertIn("# TYPE json_parser_calls_total counter", lines)
+        self.assertIn('json_parser_calls_total{method="parse_key"} 3', lines)
+        self.assertIn('json_parser_bytes_total{method="parse_string"} 12', lines)
+        self.assertEqual(lines[-1], "json_parser_max_depth 3")
+
+    def test_report_ranks_called_methods(self) -> None:
+        profile = ParseProfile()
+        JsonParser(profile=profile).parse_text(self.DOC)
+        lines = profile.format_report().splitlines()
+        self.assertTrue(lines[0].startswith("method"))
+        self.assertNotIn("parse_list", profile.format_report())
+        self.assertEqual(lines[-1], "max depth: 3")
+
+
+class TestSchema(TestCase):
+    """Test decoding documents of a known shape with a compiled schema."""
+
+    ORDER = (
+        '{"id": 42, "paid": true, "items": [{"sku": "a", "qty": 2, "price": 9.5},'
+        ' {"sku": "b", "qty": 1, "price": 3}], "note": null}'
+    )
+
+    def test_dataclass(self) -> None:
+        expected = Order(42, True, [Item("a", 2, 9.5), Item("b", 1, 3.0)], None, [])
+        self.assertEqual(JsonParser().parse_schema(self.ORDER, Order), expected)
+        res = BytesJsonParser().parse_schema(self.ORDER.encode(), Order)
+        self.assertEqual(res, expected)
+        self.assertIs(type(res.items[1].price), float)
+
+    def test_keys_out_of_order_and_defaults(self) -> None:
+        s = '{"tags": ["x"], "items": [], "paid": false, "id": 7, "id": 8}'
+        res = JsonParser().parse_schema(s, Order)
+        self.assertEqual(res, Order(8, False, [], None, ["x"]))
+
+    def test_dict_schema(self) -> None:
+        schema = Schema({"id": int, "meta": {"tags": dict[str, int]}, "raw": list})
+        s = '{"id": 1, "meta": {"tags": {"a": 1, "b": 2}}, "raw": [null, {}]}'
+        self.assertEqual(
+            JsonParser().parse_schema(s, schema),
+            {"id": 1, "meta": {"tags": {"a": 1, "b": 2}}, "raw": ["null", {}]},
+        )
+
+    def test_recursive_dataclass(self) -> None:
+        s = '{"name": "a", "children": [{"name": "b", "children": []}]}'
+        self.assertEqual(
+            JsonParser().parse_schema(s, TreeNode),
+            TreeNode("a", [TreeNode("b", [])]),
+        )
+
+    @parameterized.expand(
+        [
+            ['{"id": 1, "paid": true}'],
+            ['{"id": 1, "paid": true, "items": [], "extra": 1}'],
+            ['{"id": 1.5, "paid": true, "items": []}'],
+            ['{"id": 1, "paid": "yes", "items": []}'],
+            ['{"id": 1, "paid": true, "items": [{"sku": "a"}]}'],
+        ]
+    )
+    def test_mismatch_falls_back(self, s: str) -> None:
+        self.assertEqual(
+            JsonParser().parse_schema(s, Order), JsonParser().parse_text(s)
+        )
+
+    @parameterized.expand(
+        [
+            ['{"id": 1, "items": [],}', "Trailing commas are not allowed."],
+            ['{"id": 1, "paid": tru}', "Value unable to be parsed: invalid entry."],
+            ['{"id": 1, paid: true}', "Keys must be valid strings."],
+            ['{"id": 1, "items": [{"sku": "a}]}', "String is missing close quote."],
+        ]
+    )
+    def test_invalid_json_raises_parser_error(self, s: str, message: str) -> None:
+        with self.assertRaises(JsonParseError) as e:
+            JsonParser().parse_schema(s, Order)
+        self.assertEqual(str(e.exception), message)
+
+    def test_max_depth_applies(self) -> None:
+        s = '{"id": 1, "paid": true, "items": [], "tags": ["a"]}'
+        with self.assertRaises(JsonParseError):
+            JsonParser(max_depth=1).parse_schema(s, Order)
+        schema = Schema({"a": Any})
+        with self.assertRaises(JsonParseError):
+            JsonParser(max_depth=2).parse_schema('{"a": [[1]]}', schema)
+
+    def test_keyword_only_dataclass(self) -> None:
+        res = JsonParser().parse_schema('{"x": 1, "label": "p", "y": 2}', Point)
+        self.assertEqual(res, Point(x=1, y=2, label="p"))
+        res = JsonParser().parse_schema('{"label": "q", "x": 3}', Point)
+        self.assertEqual(res, Point(x=3, label="q"))
+
+    def test_errors_building_values_are_raised(self) -> None:
+        self.assertEqual(
+            JsonParser().parse_schema('{"low": 1, "high": 2}', Range), Range(1, 2)
+        )
+        with self.assertRaises(ValueError) as context:
+            JsonParser().parse_schema('{"low": 3, "high": 2}', Range)
+        self.assertEqual(str(context.exception), "low is above high")
+        # a number only 'float' rejects is still a mismatch, and so gives the
+        # parser's error
+        with self.assertRaises(ValueError) as context:
+            JsonParser().parse_schema('{"low": 1e, "high": 2}', Range)
+        self.assertNotEqual(str(context.exception), "low is above high")
+
+    def test_deep_document_falls_back(self) -> None:
+        # deeper than the decoders can recurse, but within 'max_depth'
+        s = '{"name": "a", "children": [' * 800 + "]}" * 800
+        res = JsonParser().parse_schema(s, TreeNode)
+        for _ in range(799):
+            self.assertEqual(res["name"], "a")
+            res = res["children"][0]
+        self.assertEqual(res, {"name": "a", "children": []})
+
+    def test_unsupported_type(self) -> None:
+        with self.assertRaises(JsonSchemaError):
+            Schema({"a": set})
+        with self.assertRaises(JsonSchemaError):
+            Schema(int)
+
+
+class TestValidate(TestCase):
+    """Test checking documents without building them."""
+
+    @parameterized.expand(
+        [[str(path)] for path in sorted(TEST_FILES_PATH.glob("step*/*.json"))]
+    )
+    def test_agrees_with_parser_on_test_files(self, file_path: str) -> None:
+        s = Path(file_path).read_text()
+        try:
+            JsonParser().parse_text(s)
+            expected = None
+        except JsonParseError as e:
+            expected = str(e)
+        errors = [JsonParser().validate(s), BytesJsonParser().validate(s.encode())]
+        for error in errors:
+            self.assertEqual(None if error is None else str(error), expected)
+
+    @parameterized.expand(
+        [
+            ['{"a": 1, "b": [true, "x"], "c": {"d": null}}', None],
+            ['{"a" 1 "b" [1 2,] "c": -.5 "d": 7.}', None],
+            ['{"a": 1, "b": 2,}', ("Trailing commas are not allowed.", 15)],
+            ['{"a": [1, 2 ,  }', ("Trailing commas are not allowed.", 12)],
+            ['{"a": [1, , 2]}', ("Value unable to be parsed: invalid entry.", 10)],
+            ['{"a": tru}', ("Value unable to be parsed: invalid entry.", 6)],
+            ['{"a": 1e}', ("Value unable to be parsed: invalid entry.", 6)],
+            ['{"a": 1, b: 2}', ("Keys must be valid strings.", 9)],
+            ['{"a": "x}', ("String is missing close quote.", 6)],
+            [
+                '{"a": [1, {"b": 2}',
+                ("Unexpected end of JSON input: invalid entry.", 18),
+            ],
+            ["  ", ("Empty JSON file detected: invalid entry.", 2)],
+            [" [1]", ('JSON file is missing starting "{": invalid entry.', 1)],
+        ]
+    )
+    def test_errors_and_offsets(self, s: str, expected: tuple | None) -> None:
+        for jp, doc in [(JsonParser(), s), (BytesJsonParser(), s.encode())]:
+            error = jp.validate(doc)
+            if expected is None:
+                self.assertIsNone(error)
+            else:
+                self.assertEqual((str(error), error.offset), expected)
+
+    def test_max_depth(self) -> None:
+        error = JsonParser(max_depth=2).validate('{"a": [1, [2]]}')
+        self.assertEqual(
+            (str(error), error.offset),
+            ("Maximum nesting depth of 2 exceeded: invalid entry.", 10),
+        )
+        self.assertIsNone(JsonParser(max_depth=2).validate('{"a": [1, 2]}'))
+
+    def test_long_strings(self) -> None:
+        s = '{"a": "' + "x" * 10000 + '", "b": ["' + "y" * 10000 + '"]}'
+        self.assertIsNone(JsonParser().validate(s))
+        error = JsonParser().validate(s[:-8])
+        self.assertEqual(str(error), "String is missing close quote.")
+
+
+class TestErrorPositions(TestCase):
+    """Test the line, column and snippet of parse errors."""
+
+    DOC = '{\n    "a": 1,\n    "b": [1, 2, tru],\n    "c": 3\n}'
+
+    def test_position(self) -> None:
+        for jp, doc in [
+            (JsonParser(), self.DOC),
+            (BytesJsonParser(), self.DOC.encode()),
+        ]:
+            with self.assertRaises(JsonParseError) as context:
+                jp.parse_buffer(doc) if isinstance(doc, bytes) else jp.parse_text(doc)
+            e = context.exception
+            self.assertEqual(str(e), "Value unable to be parsed: invalid entry.")
+            self.assertEqual((e.offset, e.line, e.column), (30, 3, 17))
+            self.assertEqual(e.snippet, '    "b": [1, 2, tru],\n' + " " * 16 + "^")
+            # the input is let go once the position is worked out
+            self.assertIsNone(e.source)
+
+    @parameterized.expand(
+        [
+            ['{"a": 1,\n "b": 2,\n}', (16, 2, 8)],
+            ['{"a": [1, 2]\n\n  "b": x}', (21, 3, 8)],
+            ['{"a": 1, b: 2}', (9, 1, 10)],
+            ['{"a": "x}', (6, 1, 7)],
+        ]
+    )
+    def test_offsets(self, s: str, expected: tuple) -> None:
+        for jp in [JsonParser(), JsonParser(columnar=True)]:
+            with self.assertRaises(JsonParseError) as context:
+                jp.parse_text(s)
+            e = context.exception
+            self.assertEqual((e.offset, e.line, e.column), expected)
+
+    def test_error_from_mmap_outlives_the_map(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "doc.json")
+            Path(path).write_text(self.DOC)
+            with self.assertRaises(JsonParseError) as context:
+                BytesJsonParser().parse_mmap(path)
+        e = context.exception
+        self.assertIsNone(e.source)
+        self.assertEqual((e.offset, e.line, e.column), (30, 3, 17))
+
+    def test_parallel_error_is_located_in_the_file(self) -> None:
+        rows = ",\n".join(f'{{"id": {i}}}' for i in range(100))
+        s = '{"rows": [\n' + rows + ',\n{"id": tru}\n]}'
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "doc.json")
+            Path(path).write_text(s)
+            with self.assertRaises(JsonParseError) as context:
+                parse_parallel(path, workers=2, threshold=0)
+        e = context.exception
+        self.assertEqual(e.offset, s.index("tru"))
+        self.assertEqual((e.line, e.column), (102, 8))
+
+    def test_pickle_keeps_position(self) -> None:
+        with self.assertRaises(JsonParseError) as context:
+            JsonParser().parse_text(self.DOC)
+        e = pickle.loads(pickle.dumps(context.exception))
+        self.assertEqual(str(e), "Value unable to be parsed: invalid entry.")
+        self.assertEqual((e.offset, e.line, e.column), (30, 3, 17))
+
+    def test_incremental_parser_offsets_are_in_the_stream(self) -> None:
+        ip = IncrementalParser()
+        ip.feed('{"a": 1}\n{"b"')
+        with self.assertRaises(JsonParseError) as context:
+            ip.feed(": [1, x]}")
+        self.assertEqual(context.exception.offset, 19)
+        self.assertIsNone(context.exception.line)
+
+
+class TestReparse(TestCase):
+    """Test parsing a document again after an edit to its text."""
+
+    DOC = '{"a": {"b": [1, {"c": "x"}, [2]], "d": {}}, "e": [true, null], "f": 3}'
+
+    @parameterized.expand(
+        [[str(path)] for path in sorted(TEST_FILES_PATH.glob("step*/*.json"))]
+    )
+    def test_parse_indexed_agrees_with_parse_text(self, file_path: str) -> None:
+        s = Path(file_path).read_text()
+        try:
+            expected = JsonParser().parse_text(s)
+        except JsonParseError as e:
+            with self.assertRaises(JsonParseError) as context:
+                JsonParser().parse_indexed(s)
+            self.assertEqual(str(context.exception), str(e))
+            return
+        self.assertEqual(JsonParser().parse_indexed(s)[0], expected)
+
+    @parameterized.expand(
+        [
+            ['"x"', 3, "1"],
+            ['"x"', 3, '{"y": [1]}'],
+            ["[2]", 3, "[3, 4]"],
+            ['"d": {}', 7, '"g": 5'],
+            ['"f": 3', 6, '"f": 4, "h": [5]'],
+            ['{"c": "x"}', 10, '{"c": "x"}], "z": [3'],
+            ["[true, null]", 12, "{}"],
+            ["1, ", 3, ""],
+            ['"a"', 0, " "],
+        ]
+    )
+    def test_matches_full_parse(self, needle: str, deleted: int, new: str) -> None:
+        offset = self.DOC.index(needle)
+        s = self.DOC[:offset] + new + self.DOC[offset + deleted :]
+        for jp, doc, text in [
+            (JsonParser(), self.DOC, s),
+            (BytesJsonParser(), self.DOC.encode(), s.encode()),
+        ]:
+            res, index = jp.parse_indexed(doc)
+            inserted = new if isinstance(doc, str) else new.encode()
+            res, index = jp.reparse(res, index, offset, deleted, inserted)
+            self.assertEqual(res, jp.parse_text(text))
+            self.assertEqual(index.text, text)
+            # the new index is the one parsing the edited text gives
+            res, index = jp.reparse(res, index, 0, 0, text[:0])
+            self.assertEqual(res, jp.parse_text(text))
+
+    def test_unchanged_values_are_reused(self) -> None:
+        jp = JsonParser()
+        doc, index = jp.parse_indexed(self.DOC)
+        offset = self.DOC.index('"x"') + 1
+        res, _ = jp.reparse(doc, index, offset, 1, "yz")
+        self.assertEqual(res["a"]["b"][1], {"c": "yz"})
+        self.assertIs(res["e"], doc["e"])
+        self.assertIs(res["a"]["d"], doc["a"]["d"])
+        self.assertIs(res["a"]["b"][2], doc["a"]["b"][2])
+        # the previous document is left as it was
+        self.assertEqual(doc["a"]["b"][1], {"c": "x"})
+
+    def test_chained_edits(self) -> None:
+        jp = JsonParser()
+        s = self.DOC
+        doc, index = jp.parse_indexed(s)
+        offset = s.index("[2]") + 1
+        for i in range(20):
+            s = s[:offset] + f"{i}, " + s[offset:]
+            doc, index = jp.reparse(doc, index, offset, 0, f"{i}, ")
+        self.assertEqual(doc, JsonParser().parse_text(s))
+        self.assertEqual(doc["a"]["b"][2], list(range(19, -1, -1)) + [2])
+
+    @parameterized.expand(
+        [
+            ["[2]", 3, "[2,}"],
+            ['"x"', 3, '"x'],
+            ["3}", 2, "3, 4}"],
+            ["[2]", 3, "[[[2]]]"],
+        ]
+    )
+    def test_invalid_edit_raises(self, needle: str, deleted: int, new: str) -> None:
+        offset = self.DOC.index(needle)
+        s = self.DOC[:offset] + new + self.DOC[offset + deleted :]
+        with self.assertRaises(JsonParseError) as context:
+            JsonParser(max_depth=4).parse_text(s)
+        expected = context.exception
+
+        jp = JsonParser(max_depth=4)
+        doc, index = jp.parse_indexed(self.DOC)
+        with self.assertRaises(JsonParseError) as context:
+            jp.reparse(doc, index, offset, deleted, new)
+        self.assertEqual(str(context.exception), str(expected))
+        self.assertEqual(context.exception.offset, expected.offset)
+
+    def test_bad_arguments(self) -> None:
+        jp = JsonParser()
+        doc, index = jp.parse_indexed(self.DOC)
+        with self.assertRaises(ValueError):
+            jp.reparse(dict(doc), index, 1, 0, " ")
+        with self.assertRaises(ValueError):
+            jp.reparse(doc, index, len(self.DOC), 1, "")
+
+
+class TestBenchmarks(TestCase):
+    """Test the benchmark corpora and report."""
+
+    @parameterized.expand([[name] for name in CORPORA])
+    def test_corpus_is_deterministic_and_parses(self, name: str) -> None:
+        doc = CORPORA[name](0.01, 0)
+        self.assertEqual(doc, CORPORA[name](0.01, 0))
+        self.assertIsInstance(JsonParser().parse_json(doc), dict)
+
+    def test_report_covers_each_parser(self) -> None:
+        report = run_benchmarks(scale=0.01, repeat=1, corpora=["wide_object"])
+        self.assertEqual(
+            [r["parser"] for r in report["results"]],
+            [
+                "json_parser",
+                "stdlib_json",
+                "jp_roundtrip",
+                "stdlib_roundtrip",
+                "jp_validate",
+            ],
+        )
+        for r in report["results"]:
+            self.assertGreater(r["mb_per_s"], 0)
+            self.assertGreater(r["peak_memory_bytes"], 0)
+
+
+class TestIncrementalParser(TestCase):
+    """Test parsing JSON objects that arrive in chunks."""
+
+    @parameterized.expand([[1], [2], [5], [64]])
+    def test_feed_in_chunks(self, chunk_size: int) -> None:
+        s = '{"a": [1, {"b": "}{"}]}\n  {"c": {}} {"d": "x"}'
+        parser = IncrementalParser()
+        res = []
+        for i in range(0, len(s), chunk_size):
+            res.extend(parser.feed(s[i : i + chunk_size]))
+        res.extend(parser.close())
+        self.assertEqual(res, [{"a": [1, {"b": "}{"}]}, {"c": {}}, {"d": "x"}])
+
+    def test_values_emitted_when_closed(self) -> None:
+        parser = IncrementalParser()
+        self.assertEqual(parser.feed('{"a": 1} {"b"'), [{"a": 1}])
+        self.assertEqual(parser.feed(": 2}"), [{"b": 2}])
+        self.assertEqual(parser.close(), [])
+
+    def test_multibyte_chars_split_across_chunks(self) -> None:
+        data = '{"key": "caf\u00e9 \u2603"}'.encode("utf-8")
+        res = list(iter_json_stream(BytesIO(data), chunk_size=1))
+        self.assertEqual(res, [{"key": "caf\u00e9 \u2603"}])
+
+    def test_raise_incomplete_value(self) -> None:
+        parser = IncrementalParser()
+        parser.feed('{"a": [1, 2')
+        with self.assertRaises(JsonParseError) as context:
+            parser.close()
+        self.assertEqual(
+            str(context.exception), "Unexpected end of JSON input: invalid entry."
+        )
+
+    @parameterized.expand([['{"a": 1} x'], ['{"a": 1,}'], ["{a: 1}"]])
+    def test_raise_invalid_value(self, s: str) -> None:
+        parser = IncrementalParser()
+        with self.assertRaises(JsonParseError):
+            parser.feed(s)
+
+    @parameterized.expand([["{"], ["["]])
+    def test_depth_limit_applied_while_scanning(self, bracket: str) -> None:
+        parser = IncrementalParser(max_depth=100)
+        parser.feed('{"a": ' + bracket * 98)
+        # the bomb is rejected as it arrives, before it is ever closed
+        with self.assertRaises(JsonParseError) as context:
+            parser.feed(bracket * 1000)
+        self.assertEqual(
+            str(context.exception),
+            "Maximum nesting depth of 100 exceeded: invalid entry.",
+        )
+        self.assertEqual(context.exception.offset, 6 + 99)
+        self.assertEqual(parser.pending, [])
+
+    def test_arrays_in_values(self) -> None:
+        parser = IncrementalParser(max_depth=4)
+        res = parser.feed('{"a": [[1], {"b": []}]}{"c": [')
+        self.assertEqual(res, [{"a": [[1], {"b": []}]}])
+        self.assertEqual(parser.feed("]}"), [{"c": []}])
+
+
 if __name__ == "__main__":
     unittest.main()